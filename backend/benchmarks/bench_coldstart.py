@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+"""
+冷启动基准测试 - 在全新的 Python 进程中导入 index 并执行 initializer，输出冷启动时间线各步骤的耗时
+
+用法：
+    cd backend && python benchmarks/bench_coldstart.py --runs 5
+    cd backend && python benchmarks/bench_coldstart.py --runs 5 --json >> coldstart.jsonl
+
+--json 每次输出一行汇总结果，追加到文件后可以按版本对比冷启动是否变慢。
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import subprocess
+
+CODE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "code")
+
+# 子进程中执行：导入入口模块、预热，打印时间线
+CHILD_SCRIPT = """
+import json, logging, sys
+logging.disable(logging.CRITICAL)
+import index
+index.initializer(None)
+sys.stdout.write(json.dumps(index.cold_start.snapshot()))
+"""
+
+
+def run_once():
+    """启动一个新进程执行预热，返回 (进程总耗时, 时间线)"""
+    start = time.perf_counter()
+    output = subprocess.run(
+        [sys.executable, "-c", CHILD_SCRIPT], cwd=CODE_DIR,
+        check=True, capture_output=True, text=True,
+    ).stdout
+    return time.perf_counter() - start, json.loads(output)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="冷启动基准测试")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--json", action="store_true", help="输出一行 JSON 汇总")
+    args = parser.parse_args()
+
+    totals = []
+    steps = {}
+    for _ in range(args.runs):
+        total, timeline = run_once()
+        totals.append(total)
+        for step in timeline["steps"]:
+            steps.setdefault(step["step"], []).append(step["duration_ms"])
+        if not timeline["warmed_up"]:
+            print("警告: 预热未完成，查看子进程日志", file=sys.stderr)
+
+    summary = {
+        "runs": args.runs,
+        "process_ms": round(statistics.median(totals) * 1000, 1),
+        "steps_ms": {name: statistics.median(values) for name, values in steps.items()},
+    }
+    if args.json:
+        print(json.dumps(summary, ensure_ascii=False))
+        return
+
+    print(f"进程启动到预热完成（中位数，{args.runs} 次）: {summary['process_ms']:.1f} ms")
+    for name, value in summary["steps_ms"].items():
+        print(f"  {name:<20} {value:>10.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
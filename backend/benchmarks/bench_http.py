@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+"""
+HTTP 吞吐基准测试 - 对本地服务（server.py）或任意部署地址发起并发 keep-alive 请求
+
+用法：
+    cd backend/code && python server.py --port 9000 --threads 16 --processes 4
+    cd backend && python benchmarks/bench_http.py --url http://127.0.0.1:9000/health --concurrency 32 --requests 5000
+    cd backend && python benchmarks/bench_http.py --url http://127.0.0.1:9000/upload --pdf resume.pdf
+"""
+import time
+import argparse
+import threading
+import http.client
+from urllib.parse import urlsplit
+
+
+def worker(url, method, body, headers, count, latencies, errors, lock):
+    """单个连接上顺序发送 count 个请求，连接断开时重连"""
+    conn = None
+    local = []
+    failed = 0
+    for _ in range(count):
+        if conn is None:
+            conn_class = http.client.HTTPSConnection if url.scheme == "https" else http.client.HTTPConnection
+            conn = conn_class(url.hostname, url.port, timeout=120)
+        start = time.perf_counter()
+        try:
+            target = url.path + ("?" + url.query if url.query else "")
+            conn.request(method, target or "/", body=body, headers=headers)
+            response = conn.getresponse()
+            response.read()
+            if response.status >= 400:
+                failed += 1
+            if response.getheader("Connection", "").lower() == "close":
+                conn.close()
+                conn = None
+        except (OSError, http.client.HTTPException):
+            failed += 1
+            conn.close()
+            conn = None
+            continue
+        local.append(time.perf_counter() - start)
+    if conn is not None:
+        conn.close()
+    with lock:
+        latencies.extend(local)
+        errors[0] += failed
+
+
+def percentile(values, p):
+    if not values:
+        return 0.0
+    index = min(len(values) - 1, int(len(values) * p / 100))
+    return values[index]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HTTP 吞吐基准测试")
+    parser.add_argument("--url", default="http://127.0.0.1:9000/health")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=2000, help="总请求数")
+    parser.add_argument("--pdf", help="POST 的 PDF 文件（不指定时发送 GET）")
+    parser.add_argument("--accept-encoding", default="", help="例如 gzip")
+    args = parser.parse_args()
+
+    url = urlsplit(args.url)
+    headers = {}
+    body = None
+    method = "GET"
+    if args.pdf:
+        with open(args.pdf, "rb") as f:
+            body = f.read()
+        method = "POST"
+        headers["Content-Type"] = "application/pdf"
+    if args.accept_encoding:
+        headers["Accept-Encoding"] = args.accept_encoding
+
+    per_worker = max(1, args.requests // args.concurrency)
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+    threads = [
+        threading.Thread(target=worker, args=(url, method, body, headers, per_worker, latencies, errors, lock))
+        for _ in range(args.concurrency)
+    ]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    total = len(latencies)
+    print(f"{method} {args.url}  并发 {args.concurrency}  请求 {total}  失败 {errors[0]}")
+    print(f"吞吐: {total / elapsed:.1f} req/s  耗时 {elapsed:.2f} s")
+    print("延迟(ms): p50 {:.2f}  p90 {:.2f}  p99 {:.2f}  max {:.2f}".format(
+        percentile(latencies, 50) * 1000, percentile(latencies, 90) * 1000,
+        percentile(latencies, 99) * 1000, (latencies[-1] if latencies else 0) * 1000,
+    ))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+"""
+JSON 序列化基准测试 - 对比标准库 json 与 orjson 在典型响应 / 请求上的编解码耗时
+
+用法：
+    cd backend && python benchmarks/bench_json.py [--pages 8] [--batch 20] [--rounds 200]
+"""
+import os
+import sys
+import json
+import time
+import base64
+import random
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "code"))
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+SECTIONS = ["教育背景", "工作经历", "项目经验", "专业技能", "自我评价"]
+WORDS = [
+    "负责", "后端服务", "设计与开发", "Python", "Java", "Kubernetes", "微服务", "性能优化",
+    "数据分析", "机器学习", "团队协作", "需求评审", "MySQL", "Redis", "高并发", "本科", "硕士",
+]
+
+
+def build_resume(pages, rng):
+    """构造一份解析结果（与 /upload 返回的 data 结构一致）"""
+    page_texts = []
+    for _ in range(pages):
+        lines = ["".join(rng.choice(WORDS) for _ in range(12)) for _ in range(40)]
+        page_texts.append("\n".join(lines))
+    raw_text = "\n".join(page_texts)
+    lines = raw_text.split("\n")
+    structured = {
+        section: lines[i::len(SECTIONS)]
+        for i, section in enumerate(SECTIONS)
+    }
+    return {
+        "cache_key": "%032x" % rng.getrandbits(128),
+        "raw_text": raw_text,
+        "pages": page_texts,
+        "structured_text": structured,
+        "extracted_info": {
+            "name": "张三",
+            "phone": "13800000000",
+            "email": "zhangsan@example.com",
+            "education": [{"school": "某某大学", "degree": "硕士", "major": "计算机科学"}],
+            "work_years": 5,
+            "skills": rng.sample(WORDS, 8),
+        },
+    }
+
+
+def build_payloads(pages, batch):
+    rng = random.Random(42)
+    resume = build_resume(pages, rng)
+    upload = {"success": True, "message": "简历解析成功", "data": resume}
+    batch_response = {
+        "success": True,
+        "message": f"批量解析完成：{batch} 份",
+        "data": [
+            {"index": i, "success": True, "data": build_resume(pages, rng)}
+            for i in range(batch)
+        ],
+    }
+    # 函数计算 HTTP 触发器事件：请求体为 Base64 编码的 JSON
+    match_body = json.dumps({
+        "resume_text": resume["raw_text"],
+        "extracted_info": resume["extracted_info"],
+        "job_description": "招聘后端工程师，熟悉 Python、Redis、MySQL，3 年以上经验，本科及以上学历。" * 5,
+    }, ensure_ascii=False).encode("utf-8")
+    event = {
+        "version": "v1",
+        "rawPath": "/match",
+        "headers": {"Content-Type": "application/json", "Accept-Encoding": "gzip"},
+        "queryParameters": {},
+        "requestContext": {"http": {"method": "POST", "path": "/match"}},
+        "body": base64.b64encode(match_body).decode("ascii"),
+        "isBase64Encoded": True,
+    }
+    return {
+        "upload 响应": upload,
+        "batch 响应": batch_response,
+        "FC 事件": event,
+    }
+
+
+def stdlib_dumps(obj):
+    return json.dumps(obj, ensure_ascii=False).encode("utf-8")
+
+
+def timed(fn, arg, rounds):
+    fn(arg)
+    start = time.perf_counter()
+    for _ in range(rounds):
+        fn(arg)
+    return (time.perf_counter() - start) / rounds * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="JSON 序列化基准测试")
+    parser.add_argument("--pages", type=int, default=8)
+    parser.add_argument("--batch", type=int, default=20)
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+
+    impls = [("json", stdlib_dumps, json.loads)]
+    if orjson is not None:
+        impls.append(("orjson", orjson.dumps, orjson.loads))
+    else:
+        print("未安装 orjson，只测试标准库 json")
+
+    print(f"{'负载':<12}{'大小(KB)':>10}{'实现':>8}{'dumps(ms)':>12}{'loads(ms)':>12}")
+    for name, payload in build_payloads(args.pages, args.batch).items():
+        encoded = stdlib_dumps(payload)
+        rounds = max(1, args.rounds // (args.batch if "batch" in name else 1))
+        for impl, dumps, loads in impls:
+            assert loads(dumps(payload)) == payload
+            dumps_ms = timed(dumps, payload, rounds)
+            loads_ms = timed(loads, encoded, rounds)
+            print(f"{name:<12}{len(encoded) / 1024:>10.1f}{impl:>8}{dumps_ms:>12.3f}{loads_ms:>12.3f}")
+
+
+if __name__ == "__main__":
+    main()
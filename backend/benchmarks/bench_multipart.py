@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+"""
+multipart 解析基准测试 - 对比旧的 split 实现与基于偏移量的零复制实现
+
+用法：
+    cd backend && python benchmarks/bench_multipart.py [--size-mb 10] [--rounds 20]
+"""
+import os
+import sys
+import time
+import argparse
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "code"))
+
+from multipart import find_file_part  # noqa: E402
+
+
+def legacy_parse_multipart(body, content_type):
+    """旧实现（index.py 原版），用于对比"""
+    boundary = None
+    for part in content_type.split(";"):
+        part = part.strip()
+        if part.startswith("boundary="):
+            boundary = part[9:].strip('"')
+            break
+    if not boundary:
+        return None
+    if isinstance(body, str):
+        body = body.encode("utf-8")
+    parts = body.split(b"--" + boundary.encode("utf-8"))
+    for part in parts:
+        if b"Content-Disposition" in part and b"filename" in part:
+            header_end = part.find(b"\r\n\r\n")
+            if header_end != -1:
+                file_data = part[header_end + 4:]
+                if file_data.endswith(b"\r\n"):
+                    file_data = file_data[:-2]
+                if file_data.endswith(b"--"):
+                    file_data = file_data[:-2]
+                if file_data.endswith(b"\r\n"):
+                    file_data = file_data[:-2]
+                return file_data
+    return None
+
+
+def streaming_parse_multipart(body, content_type):
+    part = find_file_part(body, content_type)
+    return part.data if part is not None else None
+
+
+def build_body(size):
+    """构造一个包含普通字段和 PDF 文件字段的请求体"""
+    boundary = "----CVAnalysisBenchBoundary7MA4YWxkTrZu0gW"
+    pdf = b"%PDF-1.4\n" + os.urandom(size) + b"\n%%EOF"
+    body = b"".join([
+        b"--", boundary.encode(), b"\r\n",
+        b'Content-Disposition: form-data; name="fields"\r\n\r\n',
+        b"cache_key,extracted_info\r\n",
+        b"--", boundary.encode(), b"\r\n",
+        'Content-Disposition: form-data; name="file"; filename="简历.pdf"\r\n'.encode("utf-8"),
+        b"Content-Type: application/pdf\r\n\r\n",
+        pdf, b"\r\n",
+        b"--", boundary.encode(), b"--\r\n",
+    ])
+    return body, f"multipart/form-data; boundary={boundary}", pdf
+
+
+def measure(fn, body, content_type, rounds):
+    """返回 (平均耗时 ms, 峰值额外内存 MB)"""
+    fn(body, content_type)
+    start = time.perf_counter()
+    for _ in range(rounds):
+        fn(body, content_type)
+    elapsed = (time.perf_counter() - start) / rounds * 1000
+
+    tracemalloc.start()
+    result = fn(body, content_type)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return elapsed, peak / 1024 / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description="multipart 解析基准测试")
+    parser.add_argument("--size-mb", type=float, default=10)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    body, content_type, pdf = build_body(int(args.size_mb * 1024 * 1024))
+    assert bytes(legacy_parse_multipart(body, content_type)) == pdf
+    assert bytes(streaming_parse_multipart(body, content_type)) == pdf
+
+    print(f"请求体大小: {len(body) / 1024 / 1024:.1f} MB, 轮数: {args.rounds}")
+    print(f"{'实现':<12}{'平均耗时(ms)':>14}{'峰值额外内存(MB)':>20}")
+    for name, fn in (("legacy", legacy_parse_multipart), ("streaming", streaming_parse_multipart)):
+        elapsed, peak = measure(fn, body, content_type, args.rounds)
+        print(f"{name:<12}{elapsed:>14.3f}{peak:>20.2f}")
+
+
+if __name__ == "__main__":
+    main()
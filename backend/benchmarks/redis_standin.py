@@ -0,0 +1,187 @@
+# -*- coding: utf-8 -*-
+"""
+Redis 协议替身服务 - 进程内存实现的最小 RESP2 服务端，用于在没有 Redis 的环境下验证 RedisBackend
+
+只实现缓存后端用到的命令：PING / AUTH / SELECT / GET / SET（含 PX）/ DEL / EXISTS。
+
+用法：
+    cd backend && python benchmarks/redis_standin.py --port 6390
+    # 另一个终端：CACHE_BACKEND=redis REDIS_URL=redis://127.0.0.1:6390/0 python code/server.py
+
+    cd backend && python benchmarks/redis_standin.py --check
+    # 启动替身服务并对 RedisBackend 执行读写、过期、删除和异常响应检查
+"""
+import os
+import sys
+import time
+import argparse
+import threading
+import socketserver
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "code"))
+
+
+class Store:
+    """键值存储，过期时间为 time.monotonic() 时间戳"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.data = {}
+        # 依次作为后续命令的响应返回的原始字节（模拟异常响应）
+        self.inject = []
+
+    def get(self, key):
+        with self.lock:
+            entry = self.data.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self.data[key]
+                return None
+            return value
+
+
+def _bulk(value):
+    if value is None:
+        return b"$-1\r\n"
+    return b"$%d\r\n%s\r\n" % (len(value), value)
+
+
+class RESPHandler(socketserver.StreamRequestHandler):
+
+    def read_command(self):
+        line = self.rfile.readline()
+        if not line:
+            return None
+        if not line.startswith(b"*"):
+            return line.split()
+        args = []
+        for _ in range(int(line[1:-2])):
+            length = int(self.rfile.readline()[1:-2])
+            args.append(self.rfile.read(length + 2)[:-2])
+        return args
+
+    def handle(self):
+        store = self.server.store
+        while True:
+            try:
+                args = self.read_command()
+            except (OSError, ValueError):
+                return
+            if not args:
+                return
+            if store.inject:
+                reply = store.inject.pop(0)
+            else:
+                reply = self.execute(store, args[0].upper(), args[1:])
+            try:
+                self.wfile.write(reply)
+                self.wfile.flush()
+            except OSError:
+                return
+
+    def execute(self, store, command, args):
+        if command == b"PING":
+            return b"+PONG\r\n"
+        if command in (b"AUTH", b"SELECT"):
+            return b"+OK\r\n"
+        if command == b"GET":
+            return _bulk(store.get(args[0]))
+        if command == b"SET":
+            expires_at = None
+            if len(args) >= 4 and args[2].upper() == b"PX":
+                expires_at = time.monotonic() + int(args[3]) / 1000
+            with store.lock:
+                store.data[args[0]] = (args[1], expires_at)
+            return b"+OK\r\n"
+        if command == b"DEL":
+            with store.lock:
+                removed = sum(store.data.pop(key, None) is not None for key in args)
+            return b":%d\r\n" % removed
+        if command == b"EXISTS":
+            return b":%d\r\n" % sum(store.get(key) is not None for key in args)
+        return b"-ERR unknown command '%s'\r\n" % command
+
+
+class RESPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address):
+        super().__init__(address, RESPHandler)
+        self.store = Store()
+
+
+def start(host="127.0.0.1", port=0):
+    """在后台线程启动替身服务，返回 (服务, 地址)"""
+    server = RESPServer((host, port))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"redis://{host}:{server.server_address[1]}/0"
+
+
+def check():
+    """对 RedisBackend 执行读写、过期、删除和异常响应检查"""
+    from cache_backends import RedisBackend
+
+    server, url = start()
+    backend = RedisBackend(url=url, namespace="check", ttl=60)
+    results = []
+
+    def expect(name, condition):
+        results.append(condition)
+        print(f"{'通过' if condition else '失败'}  {name}")
+
+    expect("SET 写入", backend.set("a", {"value": 1}))
+    expect("GET 读取", backend.get("a") == {"value": 1})
+    expect("GET 未命中返回默认值", backend.get("missing", "default") == "default")
+    expect("键带前缀和命名空间", server.store.get(b"cv:check:a") is not None)
+
+    expect("SET PX 写入", backend.set("short", 1, ttl=0.05))
+    time.sleep(0.1)
+    expect("PX 过期后未命中", backend.get("short") is None)
+
+    hits = backend.hits
+    expect("EXISTS 判断存在", backend.contains("a") and not backend.contains("missing"))
+    expect("EXISTS 不计入命中", backend.hits == hits)
+
+    expect("DEL 删除", backend.delete("a") and backend.get("a") is None)
+
+    backend.set("a", {"value": 1})
+    errors = backend.errors
+    server.store.inject = [b"$abc\r\n"]
+    expect("异常响应后重连并重试", backend.get("a") == {"value": 1})
+    expect("异常响应计入 errors", backend.errors == errors + 1)
+    server.store.inject = [b"?\r\n", b"$2\r\nabcd\r\n"]
+    expect("重试仍失败时按未命中处理", backend.get("a", "default") == "default")
+    expect("不同步的连接已关闭", getattr(backend._local, "conn", None) is None)
+    # 连续失败后暂停访问；恢复时间过后重新连接
+    backend._down_until = 0.0
+    expect("重连后恢复读写", backend.set("b", 2) and backend.get("b") == 2)
+
+    backend.close()
+    server.shutdown()
+    print(f"{sum(results)}/{len(results)} 项通过")
+    return all(results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Redis 协议替身服务")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=6390)
+    parser.add_argument("--check", action="store_true", help="启动替身服务并检查 RedisBackend")
+    args = parser.parse_args()
+
+    if args.check:
+        sys.exit(0 if check() else 1)
+
+    server = RESPServer((args.host, args.port))
+    print(f"Redis 协议替身服务: redis://{args.host}:{args.port}/0")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
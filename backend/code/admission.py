@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+"""
+准入控制模块 - 限制同时进行的 CPU 密集请求数，超出的请求有限等待，等不到时快速拒绝
+
+并发上限按 AIMD 调整：请求耗时低于目标时每完成一轮（约 limit 个请求）上限加 1，
+超过目标时乘以回退系数，避免单核实例上多个解析同时进行导致所有请求一起变慢。
+后台任务（异步解析）同样占用许可，但只阻塞等待、不被拒绝，也不占用同步请求的等待队列。
+"""
+import os
+import math
+import time
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+ADMISSION_ENABLED = os.environ.get("ADMISSION_ENABLED", "1").lower() not in ("0", "false", "no")
+ADMISSION_INITIAL_LIMIT = float(os.environ.get("ADMISSION_INITIAL_LIMIT", "2"))
+ADMISSION_MIN_LIMIT = float(os.environ.get("ADMISSION_MIN_LIMIT", "1"))
+ADMISSION_MAX_LIMIT = float(os.environ.get("ADMISSION_MAX_LIMIT", "10"))
+ADMISSION_MAX_QUEUE = int(os.environ.get("ADMISSION_MAX_QUEUE", "10"))
+ADMISSION_MAX_WAIT = float(os.environ.get("ADMISSION_MAX_WAIT", "2"))
+ADMISSION_TARGET_LATENCY = float(os.environ.get("ADMISSION_TARGET_LATENCY", "3"))
+ADMISSION_BACKOFF = float(os.environ.get("ADMISSION_BACKOFF", "0.9"))
+
+# 平滑耗时的权重
+_EWMA_ALPHA = 0.2
+
+
+class Overloaded(Exception):
+    """请求被拒绝，retry_after 为建议的重试等待秒数"""
+
+    def __init__(self, message, retry_after):
+        super().__init__(message)
+        self.message = message
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """AIMD 自适应并发限制 + 有界等待队列（线程安全）"""
+
+    def __init__(self, initial_limit=None, min_limit=None, max_limit=None, max_queue=None,
+                 max_wait=None, target_latency=None, backoff=None):
+        self.min_limit = ADMISSION_MIN_LIMIT if min_limit is None else min_limit
+        self.max_limit = ADMISSION_MAX_LIMIT if max_limit is None else max_limit
+        initial = ADMISSION_INITIAL_LIMIT if initial_limit is None else initial_limit
+        self.limit = min(self.max_limit, max(self.min_limit, initial))
+        self.max_queue = ADMISSION_MAX_QUEUE if max_queue is None else max_queue
+        self.max_wait = ADMISSION_MAX_WAIT if max_wait is None else max_wait
+        self.target_latency = ADMISSION_TARGET_LATENCY if target_latency is None else target_latency
+        self.backoff = ADMISSION_BACKOFF if backoff is None else backoff
+
+        self._cond = threading.Condition()
+        self.in_flight = 0
+        self.waiting = 0
+        self.background_waiting = 0
+        self.latency = 0.0
+        self.admitted = 0
+        self.rejected = 0
+        self.timeouts = 0
+        self._last_decrease = 0.0
+
+    def acquire(self, timeout=None, block=False):
+        """获取执行许可，返回开始时间（传给 release）；队列已满或等待超时时抛出 Overloaded
+
+        block 为 True 时（后台任务）一直等到有空闲许可，不计入等待队列，也不会被拒绝。
+        """
+        timeout = self.max_wait if timeout is None else timeout
+        with self._cond:
+            if block:
+                self.background_waiting += 1
+                try:
+                    while self.in_flight >= int(self.limit):
+                        self._cond.wait()
+                finally:
+                    self.background_waiting -= 1
+            elif self.in_flight >= int(self.limit):
+                if self.waiting >= self.max_queue:
+                    self.rejected += 1
+                    raise Overloaded("服务繁忙，请稍后重试", self._retry_after())
+                self.waiting += 1
+                try:
+                    deadline = time.monotonic() + timeout
+                    while self.in_flight >= int(self.limit):
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            self.timeouts += 1
+                            raise Overloaded("服务繁忙，排队超时，请稍后重试", self._retry_after())
+                        self._cond.wait(remaining)
+                finally:
+                    self.waiting -= 1
+            self.in_flight += 1
+            self.admitted += 1
+        return time.monotonic()
+
+    def try_acquire(self):
+        """不等待地获取许可：有空闲许可且没有请求在排队时返回开始时间，否则返回 None（不计入拒绝次数）"""
+        with self._cond:
+            if self.in_flight >= int(self.limit) or self.waiting or self.background_waiting:
+                return None
+            self.in_flight += 1
+            self.admitted += 1
+        return time.monotonic()
+
+    def release(self, started_at, record=True):
+        """归还许可；record 为 True 时用本次耗时调整并发上限"""
+        elapsed = time.monotonic() - started_at
+        with self._cond:
+            self.in_flight -= 1
+            if record:
+                self._update(elapsed)
+            self._cond.notify()
+
+    def _update(self, elapsed):
+        self.latency = elapsed if not self.latency else (1 - _EWMA_ALPHA) * self.latency + _EWMA_ALPHA * elapsed
+        if elapsed > self.target_latency:
+            # 同一批超时的请求只回退一次：距上次回退至少一个目标耗时
+            now = time.monotonic()
+            if now - self._last_decrease >= self.target_latency:
+                self._last_decrease = now
+                old = self.limit
+                self.limit = max(self.min_limit, self.limit * self.backoff)
+                if int(self.limit) != int(old):
+                    logger.info(f"请求耗时 {elapsed:.2f}s 超过目标，并发上限降为 {int(self.limit)}")
+        elif self.in_flight + 1 >= int(self.limit):
+            # 只有上限被用满时才说明需要更多并发
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+        if self.in_flight < int(self.limit):
+            self._cond.notify_all()
+
+    def _retry_after(self):
+        """按平滑耗时和排队人数估算重试等待秒数"""
+        estimate = (self.latency or 1.0) * (self.waiting + 1) / max(1, int(self.limit))
+        return max(1, math.ceil(estimate))
+
+    def stats(self):
+        with self._cond:
+            return {
+                "limit": int(self.limit),
+                "in_flight": self.in_flight,
+                "waiting": self.waiting,
+                "background_waiting": self.background_waiting,
+                "latency_ms": round(self.latency * 1000, 1),
+                "admitted": self.admitted,
+                "rejected": self.rejected,
+                "timeouts": self.timeouts,
+            }
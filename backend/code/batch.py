@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+"""
+批量处理模块 - 在进程池中并行解析多份简历
+
+每个工作进程启动时各自初始化解析器和提取器；进程池不可用时（如运行环境不支持
+多进程信号量）退回到当前进程串行处理。
+"""
+import os
+import logging
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from concurrent.futures.process import BrokenProcessPool
+
+from pipeline import run_pipeline
+from deadline import Deadline
+
+logger = logging.getLogger(__name__)
+
+BATCH_MAX_FILES = int(os.environ.get("BATCH_MAX_FILES", "50"))
+BATCH_WORKERS = int(os.environ.get("BATCH_WORKERS", "0")) or min(4, os.cpu_count() or 1)
+BATCH_START_METHOD = os.environ.get("BATCH_START_METHOD", "spawn")
+
+# 工作进程内的组件
+_worker_parser = None
+_worker_extractor = None
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _init_worker():
+    """工作进程初始化：加载 PDF 解析和信息提取组件"""
+    global _worker_parser, _worker_extractor
+    from resume_parser import ResumeParser
+    from info_extractor import InfoExtractor
+    _worker_parser = ResumeParser()
+    _worker_extractor = InfoExtractor()
+
+
+def _no_release():
+    pass
+
+
+def _process_in_worker(pdf_data, cache_key, skip=(), expires_at=None):
+    """在工作进程中执行解析流水线；expires_at 为请求的截止时间戳"""
+    if _worker_parser is None:
+        _init_worker()
+    deadline = Deadline(expires_at=expires_at) if expires_at else None
+    try:
+        return run_pipeline(_worker_parser, _worker_extractor, pdf_data, cache_key, skip, deadline)
+    except Exception as e:
+        return None, f"处理失败: {str(e)}"
+
+
+def get_pool():
+    """获取（必要时创建）进程池；无法创建时返回 None"""
+    global _pool
+    with _pool_lock:
+        if _pool is None and BATCH_WORKERS > 1:
+            try:
+                context = multiprocessing.get_context(BATCH_START_METHOD)
+                _pool = ProcessPoolExecutor(
+                    max_workers=BATCH_WORKERS,
+                    mp_context=context,
+                    initializer=_init_worker,
+                )
+            except (OSError, ValueError, NotImplementedError) as e:
+                logger.warning(f"进程池不可用，退回串行处理: {e}")
+                return None
+        return _pool
+
+
+def _reset_pool():
+    """进程池损坏后丢弃，下次使用时重建"""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+def iter_batch(items, parser=None, extractor=None, skip=(), deadline=None, reserve=None):
+    """并行处理 [(cache_key, pdf_data), ...]，按完成顺序产出 (cache_key, (结果, 错误信息))
+
+    进程池不可用时使用传入的 parser / extractor 在当前进程串行处理；skip 中的可选字段不计算，
+    deadline 剩余时间不足时跳过可选步骤。
+
+    reserve 用于限制同时运行的条目数：调用方已持有的一个许可覆盖一个条目，每多并行一个条目调用一次
+    reserve()，返回释放函数，没有空闲许可时返回 None（只用已有的许可继续处理）。为 None 时不限制。
+    """
+    if not items:
+        return
+
+    done = set()
+    expires_at = deadline.expires_at if deadline is not None else None
+    pool = get_pool() if len(items) > 1 else None
+    if pool is not None:
+        queue = list(items)
+        # future -> (cache_key, 释放函数)；释放函数为 None 的条目使用调用方自己的许可
+        running = {}
+        try:
+            while queue or running:
+                while queue and len(running) < BATCH_WORKERS:
+                    if all(release is not None for _, release in running.values()):
+                        release = None
+                    elif reserve is None:
+                        release = _no_release
+                    else:
+                        release = reserve()
+                        if release is None:
+                            break
+                    key, data = queue.pop(0)
+                    future = pool.submit(_process_in_worker, bytes(data), key, skip, expires_at)
+                    running[future] = (key, release)
+
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    key, release = running.pop(future)
+                    if release is not None:
+                        release()
+                    try:
+                        outcome = future.result()
+                    except BrokenProcessPool:
+                        raise
+                    except Exception as e:
+                        outcome = (None, f"处理失败: {str(e)}")
+                    done.add(key)
+                    yield key, outcome
+            return
+        except BrokenProcessPool as e:
+            # 已产出的结果保留，剩余的退回串行处理
+            logger.error(f"进程池异常，退回串行处理: {e}")
+            _reset_pool()
+        finally:
+            # 提前结束（如客户端断开）或进程池异常时归还尚未完成条目的许可
+            for future, (_, release) in running.items():
+                future.cancel()
+                if release is not None:
+                    release()
+            running.clear()
+
+    for key, data in items:
+        if key in done:
+            continue
+        try:
+            outcome = run_pipeline(parser, extractor, data, key, skip, deadline)
+        except Exception as e:
+            outcome = (None, f"处理失败: {str(e)}")
+        yield key, outcome
+
+
+def shutdown():
+    """关闭进程池"""
+    _reset_pool()
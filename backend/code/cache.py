@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+"""
+结果缓存模块 - 带条目数/字节预算、TTL 过期和 LRU 淘汰的内存缓存
+"""
+import os
+import sys
+import time
+import logging
+import threading
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+# 默认配置，可通过环境变量覆盖
+DEFAULT_MAX_ENTRIES = int(os.environ.get("CACHE_MAX_ENTRIES", "256"))
+DEFAULT_MAX_BYTES = int(os.environ.get("CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+DEFAULT_TTL = float(os.environ.get("CACHE_TTL_SECONDS", "3600"))
+
+
+def estimate_size(value):
+    """估算缓存值占用的内存字节数（递归累加容器内的元素）"""
+    seen = set()
+    stack = [value]
+    total = 0
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        total += sys.getsizeof(obj)
+        if isinstance(obj, dict):
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set, frozenset)):
+            stack.extend(obj)
+    return total
+
+
+class _Entry:
+    """缓存条目"""
+    __slots__ = ("value", "size", "expires_at")
+
+    def __init__(self, value, size, expires_at):
+        self.value = value
+        self.size = size
+        self.expires_at = expires_at
+
+
+class ResultCache:
+    """线程安全的 LRU + TTL 缓存，同时限制条目数和总字节数"""
+
+    def __init__(self, max_entries=None, max_bytes=None, ttl=None):
+        self.max_entries = DEFAULT_MAX_ENTRIES if max_entries is None else max_entries
+        self.max_bytes = DEFAULT_MAX_BYTES if max_bytes is None else max_bytes
+        self.ttl = DEFAULT_TTL if ttl is None else ttl
+
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0
+
+        # 统计计数
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.rejections = 0
+
+    def get(self, key, default=None):
+        """读取缓存，命中时刷新 LRU 顺序"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            if entry.expires_at is not None and entry.expires_at <= time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry.value
+
+    def set(self, key, value, ttl=None, size=None):
+        """写入缓存，超出预算时按 LRU 顺序淘汰；返回是否写入成功"""
+        if size is None:
+            size = estimate_size(value)
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl and ttl > 0 else None
+
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+
+            # 单个条目超过总预算，直接拒绝，避免清空整个缓存
+            if size > self.max_bytes or self.max_entries <= 0:
+                self.rejections += 1
+                logger.warning(f"缓存条目过大，未写入: {key} ({size} 字节)")
+                return False
+
+            self._data[key] = _Entry(value, size, expires_at)
+            self._bytes += size
+            self._evict()
+            return True
+
+    def delete(self, key):
+        """删除缓存条目"""
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+                return True
+            return False
+
+    def clear(self):
+        """清空缓存"""
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def contains(self, key):
+        """判断键是否存在且未过期；不计入命中统计，也不刷新 LRU 顺序"""
+        with self._lock:
+            entry = self._data.get(key)
+            return entry is not None and (entry.expires_at is None or entry.expires_at > time.monotonic())
+
+    def __contains__(self, key):
+        return self.contains(key)
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self):
+        """返回缓存统计信息"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._data),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "rejections": self.rejections,
+            }
+
+    def _remove(self, key):
+        """移除条目并更新字节计数（调用方需持有锁）"""
+        entry = self._data.pop(key)
+        self._bytes -= entry.size
+
+    def _evict(self):
+        """先清理过期条目，再按 LRU 淘汰直到满足预算（调用方需持有锁）"""
+        now = time.monotonic()
+        expired = [k for k, e in self._data.items() if e.expires_at is not None and e.expires_at <= now]
+        for key in expired:
+            self._remove(key)
+            self.expirations += 1
+
+        while self._data and (len(self._data) > self.max_entries or self._bytes > self.max_bytes):
+            key, entry = self._data.popitem(last=False)
+            self._bytes -= entry.size
+            self.evictions += 1
@@ -0,0 +1,496 @@
+# -*- coding: utf-8 -*-
+"""
+缓存后端模块 - 进程内存 / 本地 SQLite (WAL) / Redis 协议三种实现
+
+远程后端（SQLite 放在共享盘、Redis）让解析结果在实例回收和横向扩容后仍然可用，
+前面再叠加一层进程内 LRU 缓存减少远程访问。
+"""
+import os
+import json
+import time
+import socket
+import sqlite3
+import logging
+import threading
+from urllib.parse import urlparse, unquote
+
+from cache import ResultCache
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SQLITE_PATH = "/tmp/cv_analysis_cache.db"
+DEFAULT_REDIS_URL = "redis://127.0.0.1:6379/0"
+DEFAULT_KEY_PREFIX = "cv"
+
+
+def _encode_value(value):
+    """将缓存值编码为字节（远程后端使用）"""
+    return json.dumps(value, ensure_ascii=False).encode("utf-8")
+
+
+def _decode_value(data):
+    """将字节解码为缓存值"""
+    if data is None:
+        return None
+    if isinstance(data, bytes):
+        data = data.decode("utf-8")
+    return json.loads(data)
+
+
+class CacheBackend:
+    """缓存后端接口"""
+
+    name = "base"
+
+    def get(self, key, default=None):
+        raise NotImplementedError
+
+    def set(self, key, value, ttl=None):
+        raise NotImplementedError
+
+    def delete(self, key):
+        raise NotImplementedError
+
+    def contains(self, key):
+        """判断键是否存在；不读取缓存值，不计入命中统计"""
+        raise NotImplementedError
+
+    def stats(self):
+        return {"backend": self.name}
+
+    def close(self):
+        pass
+
+    def __contains__(self, key):
+        return self.contains(key)
+
+
+class MemoryBackend(CacheBackend):
+    """进程内缓存后端，直接保存 Python 对象"""
+
+    name = "memory"
+
+    def __init__(self, max_entries=None, max_bytes=None, ttl=None):
+        self.cache = ResultCache(max_entries=max_entries, max_bytes=max_bytes, ttl=ttl)
+
+    def get(self, key, default=None):
+        return self.cache.get(key, default)
+
+    def set(self, key, value, ttl=None):
+        return self.cache.set(key, value, ttl=ttl)
+
+    def delete(self, key):
+        return self.cache.delete(key)
+
+    def contains(self, key):
+        return self.cache.contains(key)
+
+    def stats(self):
+        stats = self.cache.stats()
+        stats["backend"] = self.name
+        return stats
+
+    def __len__(self):
+        return len(self.cache)
+
+
+class SQLiteBackend(CacheBackend):
+    """本地 SQLite 缓存后端（WAL 模式），多进程可共享同一个数据库文件"""
+
+    name = "sqlite"
+
+    def __init__(self, path=None, namespace="", max_entries=None, max_bytes=None, ttl=None):
+        self.path = path or os.environ.get("CACHE_SQLITE_PATH", DEFAULT_SQLITE_PATH)
+        self.namespace = namespace
+        self.max_entries = max_entries if max_entries is not None else int(os.environ.get("CACHE_SQLITE_MAX_ENTRIES", "10000"))
+        self.max_bytes = max_bytes if max_bytes is not None else int(os.environ.get("CACHE_SQLITE_MAX_BYTES", str(512 * 1024 * 1024)))
+        self.ttl = ttl if ttl is not None else float(os.environ.get("CACHE_TTL_SECONDS", "3600"))
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        # 提前建表，配置错误时在启动阶段暴露
+        self._conn()
+
+    def _conn(self):
+        """每个线程使用独立连接"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache_entries ("
+                "key TEXT PRIMARY KEY, value BLOB NOT NULL, size INTEGER NOT NULL, "
+                "expires_at REAL, accessed_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_accessed ON cache_entries (accessed_at)")
+            self._local.conn = conn
+        return conn
+
+    def _key(self, key):
+        return f"{self.namespace}:{key}" if self.namespace else key
+
+    def _count(self, attr):
+        with self._lock:
+            setattr(self, attr, getattr(self, attr) + 1)
+
+    def get(self, key, default=None):
+        try:
+            conn = self._conn()
+            row = conn.execute(
+                "SELECT value, expires_at FROM cache_entries WHERE key = ?", (self._key(key),)
+            ).fetchone()
+            now = time.time()
+            if row is None or (row[1] is not None and row[1] <= now):
+                if row is not None:
+                    conn.execute("DELETE FROM cache_entries WHERE key = ?", (self._key(key),))
+                self._count("misses")
+                return default
+            conn.execute("UPDATE cache_entries SET accessed_at = ? WHERE key = ?", (now, self._key(key)))
+            self._count("hits")
+            return _decode_value(row[0])
+        except (sqlite3.Error, ValueError) as e:
+            self._count("errors")
+            logger.warning(f"SQLite 缓存读取失败: {e}")
+            return default
+
+    def set(self, key, value, ttl=None):
+        ttl = self.ttl if ttl is None else ttl
+        data = _encode_value(value)
+        if len(data) > self.max_bytes:
+            return False
+        now = time.time()
+        expires_at = now + ttl if ttl and ttl > 0 else None
+        try:
+            conn = self._conn()
+            conn.execute(
+                "INSERT OR REPLACE INTO cache_entries (key, value, size, expires_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (self._key(key), data, len(data), expires_at, now),
+            )
+            self._prune(conn, now)
+            return True
+        except sqlite3.Error as e:
+            self._count("errors")
+            logger.warning(f"SQLite 缓存写入失败: {e}")
+            return False
+
+    def delete(self, key):
+        try:
+            cur = self._conn().execute("DELETE FROM cache_entries WHERE key = ?", (self._key(key),))
+            return cur.rowcount > 0
+        except sqlite3.Error as e:
+            self._count("errors")
+            logger.warning(f"SQLite 缓存删除失败: {e}")
+            return False
+
+    def contains(self, key):
+        try:
+            row = self._conn().execute(
+                "SELECT 1 FROM cache_entries WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)",
+                (self._key(key), time.time()),
+            ).fetchone()
+            return row is not None
+        except sqlite3.Error as e:
+            self._count("errors")
+            logger.warning(f"SQLite 缓存查询失败: {e}")
+            return False
+
+    def _prune(self, conn, now):
+        """清理过期条目，并按最近访问时间淘汰超出预算的条目"""
+        conn.execute("DELETE FROM cache_entries WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,))
+        count, total = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache_entries").fetchone()
+        if count <= self.max_entries and total <= self.max_bytes:
+            return
+        rows = conn.execute("SELECT key, size FROM cache_entries ORDER BY accessed_at").fetchall()
+        victims = []
+        for key, size in rows:
+            if count <= self.max_entries and total <= self.max_bytes:
+                break
+            victims.append((key,))
+            count -= 1
+            total -= size
+        conn.executemany("DELETE FROM cache_entries WHERE key = ?", victims)
+
+    def stats(self):
+        stats = {"backend": self.name, "path": self.path, "hits": self.hits, "misses": self.misses, "errors": self.errors}
+        try:
+            count, total = self._conn().execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache_entries"
+            ).fetchone()
+            stats.update({"entries": count, "bytes": total})
+        except sqlite3.Error:
+            pass
+        return stats
+
+    def close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+class RedisError(Exception):
+    """Redis 服务端返回的错误"""
+
+
+class RedisProtocolError(ConnectionError):
+    """无法解析的响应；连接已不同步，按连接错误处理（关闭连接并重连）"""
+
+
+class _RedisConnection:
+    """最小化的 RESP2 协议连接，只实现缓存需要的命令"""
+
+    def __init__(self, host, port, timeout):
+        self.sock = socket.create_connection((host, port), timeout=timeout)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.reader = self.sock.makefile("rb")
+
+    def execute(self, *args):
+        self.sock.sendall(self._pack(args))
+        return self._read_reply()
+
+    @staticmethod
+    def _pack(args):
+        out = [b"*%d\r\n" % len(args)]
+        for arg in args:
+            if isinstance(arg, str):
+                arg = arg.encode("utf-8")
+            elif not isinstance(arg, (bytes, bytearray)):
+                arg = str(arg).encode("utf-8")
+            out.append(b"$%d\r\n" % len(arg))
+            out.append(arg)
+            out.append(b"\r\n")
+        return b"".join(out)
+
+    def _read_reply(self):
+        line = self.reader.readline()
+        if not line:
+            raise ConnectionError("Redis 连接已关闭")
+        if not line.endswith(b"\r\n"):
+            raise RedisProtocolError(f"响应不完整: {line!r}")
+        prefix, payload = line[:1], line[1:-2]
+        try:
+            if prefix == b"+":
+                return payload.decode("utf-8")
+            if prefix == b"-":
+                raise RedisError(payload.decode("utf-8"))
+            if prefix == b":":
+                return int(payload)
+            if prefix == b"$":
+                length = int(payload)
+                if length == -1:
+                    return None
+                data = self.reader.read(length + 2)
+                if len(data) != length + 2 or not data.endswith(b"\r\n"):
+                    raise RedisProtocolError("批量字符串长度与声明不一致")
+                return data[:-2]
+            if prefix == b"*":
+                length = int(payload)
+                if length == -1:
+                    return None
+                return [self._read_reply() for _ in range(length)]
+        except (ValueError, UnicodeDecodeError) as e:
+            raise RedisProtocolError(f"无法解析的响应: {line!r}") from e
+        raise RedisProtocolError(f"无法识别的响应: {line!r}")
+
+    def close(self):
+        try:
+            self.reader.close()
+            self.sock.close()
+        except OSError:
+            pass
+
+
+class RedisBackend(CacheBackend):
+    """Redis 协议缓存后端（兼容 Redis / Tair / KeyDB 等）"""
+
+    name = "redis"
+
+    def __init__(self, url=None, namespace="", ttl=None, timeout=2.0):
+        self.url = url or os.environ.get("REDIS_URL", DEFAULT_REDIS_URL)
+        parsed = urlparse(self.url)
+        self.host = parsed.hostname or "127.0.0.1"
+        self.port = parsed.port or 6379
+        self.password = unquote(parsed.password) if parsed.password else None
+        self.username = unquote(parsed.username) if parsed.username else None
+        self.db = int(parsed.path.lstrip("/") or 0)
+        self.prefix = os.environ.get("CACHE_KEY_PREFIX", DEFAULT_KEY_PREFIX)
+        self.namespace = namespace
+        self.ttl = ttl if ttl is not None else float(os.environ.get("CACHE_TTL_SECONDS", "3600"))
+        self.timeout = timeout
+        self.retry_interval = float(os.environ.get("REDIS_RETRY_INTERVAL", "5"))
+        self._down_until = 0.0
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    def _key(self, key):
+        parts = [p for p in (self.prefix, self.namespace, key) if p]
+        return ":".join(parts)
+
+    def _connect(self):
+        conn = _RedisConnection(self.host, self.port, self.timeout)
+        if self.password:
+            if self.username:
+                conn.execute("AUTH", self.username, self.password)
+            else:
+                conn.execute("AUTH", self.password)
+        if self.db:
+            conn.execute("SELECT", self.db)
+        return conn
+
+    def _execute(self, *args):
+        """执行命令，连接断开时重连重试一次；连续失败后暂停访问一段时间"""
+        if time.monotonic() < self._down_until:
+            raise ConnectionError("Redis 暂时不可用")
+        for attempt in range(2):
+            conn = getattr(self._local, "conn", None)
+            try:
+                if conn is None:
+                    conn = self._connect()
+                    self._local.conn = conn
+                return conn.execute(*args)
+            except (OSError, ConnectionError) as e:
+                if isinstance(e, RedisProtocolError):
+                    self._count("errors")
+                    logger.warning(f"Redis 响应无法解析，关闭连接: {e}")
+                if conn is not None:
+                    conn.close()
+                self._local.conn = None
+                if attempt == 1:
+                    self._down_until = time.monotonic() + self.retry_interval
+                    raise
+
+    def _count(self, attr):
+        with self._lock:
+            setattr(self, attr, getattr(self, attr) + 1)
+
+    def get(self, key, default=None):
+        try:
+            data = self._execute("GET", self._key(key))
+        except (OSError, ConnectionError, RedisError) as e:
+            self._count("errors")
+            logger.warning(f"Redis 缓存读取失败: {e}")
+            return default
+        if data is None:
+            self._count("misses")
+            return default
+        try:
+            value = _decode_value(data)
+        except ValueError as e:
+            self._count("errors")
+            logger.warning(f"Redis 缓存值无法解码: {e}")
+            return default
+        self._count("hits")
+        return value
+
+    def set(self, key, value, ttl=None):
+        ttl = self.ttl if ttl is None else ttl
+        args = ["SET", self._key(key), _encode_value(value)]
+        if ttl and ttl > 0:
+            args.extend(["PX", int(ttl * 1000)])
+        try:
+            return self._execute(*args) == "OK"
+        except (OSError, ConnectionError, RedisError) as e:
+            self._count("errors")
+            logger.warning(f"Redis 缓存写入失败: {e}")
+            return False
+
+    def delete(self, key):
+        try:
+            return bool(self._execute("DEL", self._key(key)))
+        except (OSError, ConnectionError, RedisError) as e:
+            self._count("errors")
+            logger.warning(f"Redis 缓存删除失败: {e}")
+            return False
+
+    def contains(self, key):
+        try:
+            return bool(self._execute("EXISTS", self._key(key)))
+        except (OSError, ConnectionError, RedisError) as e:
+            self._count("errors")
+            logger.warning(f"Redis 缓存查询失败: {e}")
+            return False
+
+    def stats(self):
+        return {
+            "backend": self.name,
+            "host": f"{self.host}:{self.port}",
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors,
+        }
+
+    def close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+class TieredBackend(CacheBackend):
+    """两级缓存：进程内 LRU 在前，共享后端在后"""
+
+    def __init__(self, local, remote):
+        self.local = local
+        self.remote = remote
+        self.name = f"memory+{remote.name}"
+
+    def get(self, key, default=None):
+        value = self.local.get(key)
+        if value is not None:
+            return value
+        value = self.remote.get(key)
+        if value is None:
+            return default
+        self.local.set(key, value)
+        return value
+
+    def set(self, key, value, ttl=None):
+        self.local.set(key, value, ttl=ttl)
+        return self.remote.set(key, value, ttl=ttl)
+
+    def delete(self, key):
+        local_deleted = self.local.delete(key)
+        return self.remote.delete(key) or local_deleted
+
+    def contains(self, key):
+        return self.local.contains(key) or self.remote.contains(key)
+
+    def stats(self):
+        return {"backend": self.name, "local": self.local.stats(), "remote": self.remote.stats()}
+
+    def close(self):
+        self.remote.close()
+
+
+def create_cache_backend(namespace="", kind=None, local_cache=True, **options):
+    """根据 CACHE_BACKEND 环境变量（memory / sqlite / redis）创建缓存后端
+
+    local_cache=False 时共享后端不加进程内一级缓存，用于会被其他实例更新的数据。
+    """
+    kind = (kind or os.environ.get("CACHE_BACKEND", "memory")).lower()
+    local_options = {k: options[k] for k in ("max_entries", "max_bytes", "ttl") if k in options}
+    local = MemoryBackend(**local_options)
+    if kind == "memory":
+        return local
+
+    try:
+        if kind == "sqlite":
+            remote = SQLiteBackend(namespace=namespace, ttl=options.get("ttl"))
+        elif kind == "redis":
+            remote = RedisBackend(namespace=namespace, ttl=options.get("ttl"))
+        else:
+            raise ValueError(f"未知的缓存后端: {kind}")
+    except (sqlite3.Error, OSError, ValueError) as e:
+        # 共享后端不可用时退回进程内缓存，保证服务可用
+        logger.error(f"创建缓存后端失败，使用内存缓存: {e}")
+        return local
+    return TieredBackend(local, remote) if local_cache else remote
@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+"""
+响应压缩模块 - 按 Accept-Encoding 协商 gzip / deflate，超过阈值的响应体压缩后以 Base64 返回
+
+函数计算 HTTP 触发器要求二进制响应体使用 Base64 编码并设置 isBase64Encoded。
+"""
+import os
+import gzip
+import zlib
+import time
+import base64
+import threading
+
+COMPRESSION_MIN_SIZE = int(os.environ.get("COMPRESSION_MIN_SIZE", "1024"))
+COMPRESSION_LEVEL = int(os.environ.get("COMPRESSION_LEVEL", "6"))
+
+# 服务端优先顺序
+SUPPORTED_ENCODINGS = ("gzip", "deflate")
+
+
+class CompressionStats:
+    """压缩统计（线程安全）：压缩次数、压缩前后字节数和耗费的 CPU 时间"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.compressed = 0
+        self.skipped = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.cpu_seconds = 0.0
+
+    def record(self, bytes_in, bytes_out, cpu_seconds):
+        with self._lock:
+            self.compressed += 1
+            self.bytes_in += bytes_in
+            self.bytes_out += bytes_out
+            self.cpu_seconds += cpu_seconds
+
+    def record_skip(self):
+        with self._lock:
+            self.skipped += 1
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "compressed": self.compressed,
+                "skipped": self.skipped,
+                "bytes_in": self.bytes_in,
+                "bytes_out": self.bytes_out,
+                "bytes_saved": self.bytes_in - self.bytes_out,
+                "ratio": round(self.bytes_out / self.bytes_in, 4) if self.bytes_in else 0.0,
+                "cpu_ms": round(self.cpu_seconds * 1000, 3),
+            }
+
+
+stats = CompressionStats()
+
+
+def negotiate(accept_encoding):
+    """根据 Accept-Encoding 选择编码，不接受任何支持的编码时返回 None"""
+    if not accept_encoding:
+        return None
+    weights = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        name = name.strip().lower()
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if name:
+            weights[name] = q
+
+    best, best_q = None, 0.0
+    for encoding in SUPPORTED_ENCODINGS:
+        q = weights.get(encoding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def compress(data, encoding, level=None):
+    """压缩字节数据"""
+    level = COMPRESSION_LEVEL if level is None else level
+    if encoding == "gzip":
+        return gzip.compress(data, compresslevel=level, mtime=0)
+    if encoding == "deflate":
+        return zlib.compress(data, level)
+    raise ValueError(f"不支持的编码: {encoding}")
+
+
+def encode_body(data, encoding, min_size=None):
+    """按协商的编码压缩响应体，返回 (字节数据, 实际使用的编码)；过小或压缩无收益时不压缩"""
+    min_size = COMPRESSION_MIN_SIZE if min_size is None else min_size
+    if len(data) < min_size:
+        return data, None
+    if encoding is None:
+        stats.record_skip()
+        return data, None
+
+    start = time.thread_time()
+    compressed = compress(data, encoding)
+    elapsed = time.thread_time() - start
+    stats.record(len(data), len(compressed), elapsed)
+
+    if len(compressed) >= len(data):
+        return data, None
+    return compressed, encoding
+
+
+def build_response(status_code, data, encoding, headers=None):
+    """用已编码的响应体构造 FC 响应"""
+    headers = dict(headers or {})
+    if encoding:
+        headers["Content-Encoding"] = encoding
+        return {
+            "statusCode": status_code,
+            "headers": headers,
+            "body": base64.b64encode(data).decode("ascii"),
+            "isBase64Encoded": True
+        }
+    return {
+        "statusCode": status_code,
+        "headers": headers,
+        "body": data.decode("utf-8")
+    }
+
+
+def compress_response(response, accept_encoding, min_size=None):
+    """按协商结果压缩 FC 响应；已编码、过小或客户端不支持时原样返回"""
+    min_size = COMPRESSION_MIN_SIZE if min_size is None else min_size
+    body = response.get("body")
+    headers = response.setdefault("headers", {})
+    if not body or response.get("isBase64Encoded") or "Content-Encoding" in headers:
+        return response
+
+    data = body.encode("utf-8") if isinstance(body, str) else body
+    if len(data) < min_size:
+        return response
+
+    headers["Vary"] = "Accept-Encoding"
+    data, encoding = encode_body(data, negotiate(accept_encoding), min_size)
+    if encoding is None:
+        return response
+    response.update(build_response(response["statusCode"], data, encoding, headers))
+    return response
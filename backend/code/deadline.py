@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+"""
+时间预算模块 - 请求携带截止时间，剩余时间不足时跳过可选步骤并记录被降级的字段
+
+截止时间使用墙上时钟，可以随任务传给批量解析的工作进程。
+"""
+import os
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+# 默认预算（秒），0 表示只受函数超时限制
+REQUEST_BUDGET = float(os.environ.get("REQUEST_BUDGET_SECONDS", "0"))
+# 剩余时间低于该值时跳过可选步骤
+DEADLINE_RESERVE = float(os.environ.get("DEADLINE_RESERVE_SECONDS", "1"))
+# 按函数超时推算预算时预留的时间（序列化、网络传输等）
+DEADLINE_SAFETY_MARGIN = float(os.environ.get("DEADLINE_SAFETY_MARGIN", "2"))
+
+
+class Deadline:
+    """请求的截止时间和因预算不足而跳过的步骤"""
+
+    def __init__(self, budget=None, expires_at=None, reserve=None):
+        if expires_at is None and budget:
+            expires_at = time.time() + budget
+        self.expires_at = expires_at
+        self.reserve = DEADLINE_RESERVE if reserve is None else reserve
+        self.degraded = []
+
+    @classmethod
+    def from_request(cls, requested=None, function_timeout=None):
+        """按请求指定的预算、REQUEST_BUDGET_SECONDS 和函数超时中最小的一个创建"""
+        candidates = []
+        if requested:
+            candidates.append(float(requested))
+        if REQUEST_BUDGET > 0:
+            candidates.append(REQUEST_BUDGET)
+        if function_timeout:
+            candidates.append(max(0.0, float(function_timeout) - DEADLINE_SAFETY_MARGIN))
+        candidates = [c for c in candidates if c > 0]
+        return cls(min(candidates) if candidates else None)
+
+    def remaining(self):
+        """剩余秒数，没有截止时间时为无穷大"""
+        if self.expires_at is None:
+            return float("inf")
+        return self.expires_at - time.time()
+
+    def is_low(self):
+        """剩余时间是否已低于预留值"""
+        return self.remaining() <= self.reserve
+
+    def allows(self, step):
+        """剩余时间是否足够执行可选步骤 step；不够时记录为降级"""
+        if not self.is_low():
+            return True
+        if step not in self.degraded:
+            logger.warning(f"时间预算不足（剩余 {self.remaining():.2f}s），跳过: {step}")
+        self.degraded.append(step)
+        return False
+
+
+def allows(deadline, step):
+    """deadline 为 None 时总是允许"""
+    return deadline is None or deadline.allows(step)
+
+
+def degraded_since(deadline, start):
+    """返回 deadline 在 start 位置之后新增的降级步骤（同一个 deadline 被多次使用时区分各次结果）"""
+    if deadline is None:
+        return []
+    return deadline.degraded[start:]
+
+
+def degraded_count(deadline):
+    return len(deadline.degraded) if deadline is not None else 0
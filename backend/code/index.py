@@ -3,10 +3,31 @@
 阿里云函数计算入口文件
 简历分析 RESTful API 服务
 """
-import json
+import os
+import time
 import base64
+import hashlib
 import logging
 import traceback
+from urllib.parse import parse_qs, unquote
+from warmup import timeline as cold_start, run as run_warmup
+from cache import ResultCache
+from cache_backends import create_cache_backend
+from singleflight import SingleFlight
+from pipeline import run_pipeline, missing_fields, OPTIONAL_FIELDS
+from projection import Projection
+from serialization import dumps, dumps_bytes, loads, BACKEND as JSON_BACKEND
+from compression import (
+    compress_response, encode_body, build_response, negotiate, stats as compression_stats
+)
+from multipart import find_file_part, parse_form
+from batch import iter_batch, BATCH_MAX_FILES
+from upload_session import UploadSessionManager, UploadSessionError
+from jobs import JobManager, JobQueueFull
+from admission import AdmissionController, Overloaded, ADMISSION_ENABLED
+from deadline import Deadline
+from timing import stage, begin as begin_timings, end as end_timings, current as current_timings
+import metrics
 
 # 配置日志
 logging.basicConfig(level=logging.INFO)
@@ -17,36 +38,490 @@ resume_parser = None
 info_extractor = None
 resume_matcher = None
 
-# 简单的内存缓存
-cache = {}
+# 直接上传 PDF 二进制时支持的内容类型
+RAW_PDF_CONTENT_TYPES = ("application/pdf", "application/octet-stream")
+
+# /rank 限制：单次最多排序的简历数，分页默认大小和最大值
+RANK_MAX_RESUMES = int(os.environ.get("RANK_MAX_RESUMES", "1000"))
+RANK_DEFAULT_LIMIT = 20
+RANK_MAX_LIMIT = 100
+
+# /match/multi 单次最多匹配的岗位数
+MULTI_MAX_JOBS = int(os.environ.get("MULTI_MAX_JOBS", "200"))
+
+# 解析结果缓存（进程内 LRU + 可选的 SQLite / Redis 共享后端）
+cache = create_cache_backend("resume")
+
+# 已序列化（及压缩）的响应体缓存，按 cache_key + 投影 + 文件名 + 编码区分；
+# 只在本实例内存中保存，命中时跳过 JSON 序列化和压缩
+body_cache = ResultCache(
+    max_entries=int(os.environ.get("BODY_CACHE_MAX_ENTRIES", "512")),
+    max_bytes=int(os.environ.get("BODY_CACHE_MAX_BYTES", str(32 * 1024 * 1024))),
+)
+
+# /match 结果缓存：按简历内容、规范化后的岗位描述和评分器版本区分，只在本实例内存中保存
+match_cache = ResultCache(
+    max_entries=int(os.environ.get("MATCH_CACHE_MAX_ENTRIES", "1024")),
+    max_bytes=int(os.environ.get("MATCH_CACHE_MAX_BYTES", str(16 * 1024 * 1024))),
+)
+
+# 已注册的岗位画像（POST /jd），按 jd_id 在多次匹配间复用
+JD_TTL_SECONDS = float(os.environ.get("JD_TTL_SECONDS", "86400"))
+job_registry = create_cache_backend("jd", ttl=JD_TTL_SECONDS)
+
+# GET /result 响应的缓存策略：简历属于个人数据，默认只允许浏览器缓存，每次使用前用 ETag 重新验证
+RESULT_CACHE_CONTROL = os.environ.get("RESULT_CACHE_CONTROL", "private, no-cache")
+
+# 文件 SHA-256 到 cache_key 的映射：浏览器只能用 Web Crypto 计算 SHA-256，上传前凭它查询是否已有解析结果
+content_aliases = create_cache_backend("sha256")
+
+# 相同 PDF 的并发上传合并为一次解析
+upload_flight = SingleFlight()
+
+# 分片上传会话
+upload_sessions = UploadSessionManager()
+
+# 异步解析任务
+jobs = JobManager()
+
+# CPU 密集接口的准入控制（ADMISSION_ENABLED=0 时关闭）
+admission = AdmissionController() if ADMISSION_ENABLED else None
+
+# 有固定路由的路径，其他路径在指标中统一记为 other，避免标签基数随请求增长
+METRIC_ROUTES = (
+    "/", "/health", "/metrics", "/upload", "/upload/check", "/upload/batch", "/upload/session",
+    "/match", "/match/multi", "/rank", "/jd"
+)
+
+def cache_tiers():
+    """解析结果缓存和响应体缓存各层的统计快照，供 /metrics 使用"""
+    tiers = []
+    stats = cache.stats()
+    if "local" in stats:
+        tiers.append(({"cache": "resume", "tier": "local"}, stats["local"]))
+        tiers.append(({"cache": "resume", "tier": stats["remote"]["backend"]}, stats["remote"]))
+    else:
+        tiers.append(({"cache": "resume", "tier": stats["backend"]}, stats))
+    tiers.append(({"cache": "body", "tier": "memory"}, body_cache.stats()))
+    tiers.append(({"cache": "match", "tier": "memory"}, match_cache.stats()))
+    return tiers
+
+
+metrics.registry.register_collector(metrics.stats_collector("cv_cache", cache_tiers, [
+    ("hits", "hits_total", "counter", "缓存命中次数"),
+    ("misses", "misses_total", "counter", "缓存未命中次数"),
+    ("hit_ratio", "hit_ratio", "gauge", "缓存命中率"),
+    ("entries", "entries", "gauge", "缓存条目数"),
+    ("bytes", "bytes", "gauge", "缓存占用字节数"),
+    ("evictions", "evictions_total", "counter", "LRU 淘汰次数"),
+    ("errors", "errors_total", "counter", "共享缓存后端错误次数"),
+]))
+metrics.registry.register_collector(metrics.stats_collector(
+    "cv_compression", lambda: [({}, compression_stats.snapshot())], [
+        ("compressed", "responses_total", "counter", "压缩的响应数"),
+        ("skipped", "skipped_total", "counter", "未压缩的响应数"),
+        ("bytes_in", "bytes_in_total", "counter", "压缩前字节数"),
+        ("bytes_out", "bytes_out_total", "counter", "压缩后字节数"),
+        ("cpu_ms", "cpu_milliseconds_total", "counter", "压缩耗费的 CPU 时间（毫秒）"),
+    ]
+))
+metrics.registry.register_collector(metrics.stats_collector(
+    "cv_admission", lambda: [({}, admission.stats())] if admission else [], [
+        ("limit", "limit", "gauge", "当前并发上限"),
+        ("in_flight", "in_flight", "gauge", "已获得许可的请求数"),
+        ("waiting", "waiting", "gauge", "排队等待的请求数"),
+        ("background_waiting", "background_waiting", "gauge", "等待许可的后台任务数"),
+        ("admitted", "admitted_total", "counter", "获得许可的请求数"),
+        ("rejected", "rejected_total", "counter", "因队列已满被拒绝的请求数"),
+        ("timeouts", "timeouts_total", "counter", "排队超时的请求数"),
+    ]
+))
+metrics.registry.register_collector(metrics.stats_collector(
+    "cv_jobs", lambda: [({}, jobs.stats())], [
+        ("pending", "pending", "gauge", "未完成的异步任务数"),
+    ]
+))
+metrics.registry.register_collector(lambda: [(
+    "cv_cold_start_step_seconds", "gauge", "冷启动各步骤耗时",
+    [({"step": step["step"]}, round(step["duration_ms"] / 1000, 4)) for step in cold_start.snapshot()["steps"]]
+)])
+
+# 入口模块的导入耗时（不含组件初始化）
+cold_start.mark("import_index")
+
 
 def init_components():
     """延迟初始化组件"""
     global resume_parser, info_extractor, resume_matcher
     if resume_parser is None:
-        from resume_parser import ResumeParser
-        from info_extractor import InfoExtractor
-        from matcher import ResumeMatcher
-        resume_parser = ResumeParser()
-        info_extractor = InfoExtractor()
-        resume_matcher = ResumeMatcher()
+        with cold_start.step("init_components"):
+            from resume_parser import ResumeParser
+            from info_extractor import InfoExtractor
+            from matcher import ResumeMatcher
+            # 匹配器在构造时预编译全部技能匹配模式
+            resume_matcher = ResumeMatcher()
+            info_extractor = InfoExtractor()
+            resume_parser = ResumeParser()
+
 
+def initializer(context):
+    """函数计算实例初始化入口（s.yaml 中的 initializer）：预热组件，首个请求不再承担冷启动开销"""
+    run_warmup(init_components, lambda: (resume_parser, info_extractor, resume_matcher))
 
-def create_response(status_code, body, origin=None):
+
+def create_response(status_code, body, origin=None, headers=None):
     """创建 HTTP 响应"""
     # CORS 完全交给阿里云 HTTP 触发器配置，代码中不设置任何 CORS 头
-    headers = {
+    response_headers = {
         "Content-Type": "application/json; charset=utf-8"
     }
+    if headers:
+        response_headers.update(headers)
+    
+    timings = current_timings()
+    if timings is not None and timings.include_body and isinstance(body, dict):
+        body["timings"] = timings.as_dict()
+    with stage("serialize"):
+        data = dumps(body)
     
     return {
         "statusCode": status_code,
-        "headers": headers,
-        "body": json.dumps(body, ensure_ascii=False)
+        "headers": response_headers,
+        "body": data
+    }
+
+
+class _AdmittedBody:
+    """流式响应体：全部写出（或连接关闭）后才归还准入许可"""
+    
+    def __init__(self, body, started_at):
+        self.body = body
+        self.started_at = started_at
+        self.released = False
+    
+    def __iter__(self):
+        try:
+            yield from self.body
+        finally:
+            self.close()
+    
+    def close(self):
+        if not self.released:
+            self.released = True
+            admission.release(self.started_at)
+
+
+def run_admitted(fn, origin=None):
+    """在准入控制下执行 CPU 密集的处理函数；排队已满或等待超时时返回 503 + Retry-After"""
+    if admission is None:
+        return fn()
+    try:
+        with stage("admission_wait"):
+            started_at = admission.acquire()
+    except Overloaded as e:
+        logger.warning(f"请求被拒绝: {e.message}")
+        return create_response(
+            503, {"error": e.message, "retry_after": e.retry_after}, origin,
+            headers={"Retry-After": str(e.retry_after)}
+        )
+    
+    try:
+        response = fn()
+    except BaseException:
+        admission.release(started_at, record=False)
+        raise
+    body = response.get("body")
+    if body is not None and not isinstance(body, (str, bytes)):
+        response["body"] = _AdmittedBody(body, started_at)
+    else:
+        admission.release(started_at)
+    return response
+
+
+def reserve_permit():
+    """为批量解析中额外并行的条目获取许可，返回释放函数；没有空闲许可时返回 None"""
+    if admission is None:
+        return lambda: None
+    started_at = admission.try_acquire()
+    if started_at is None:
+        return None
+    return lambda: admission.release(started_at)
+
+
+def is_overloaded(response):
+    """响应是否为过载拒绝（503 + Retry-After）：请求未被处理，客户端可以按 Retry-After 重试"""
+    return response.get("statusCode") == 503 and "Retry-After" in (response.get("headers") or {})
+
+
+def create_stream_response(lines, origin=None):
+    """创建 NDJSON 响应：body 是逐行产出的字节迭代器
+
+    函数计算的 HTTP 触发器不支持流式返回，handler 会在返回前合并全部行；
+    本地 HTTP 服务（server.py）按行写出，客户端可以先拿到先完成的结果。
+    """
+    def generate():
+        try:
+            for line in lines:
+                yield dumps_bytes(line) + b"\n"
+        except Exception as e:
+            # 响应头已经发出，错误以最后一行返回
+            logger.error(f"流式响应失败: {str(e)}")
+            yield dumps_bytes({"type": "error", "error": f"处理失败: {str(e)}"}) + b"\n"
+    
+    return {
+        "statusCode": 200,
+        "headers": {
+            "Content-Type": "application/x-ndjson; charset=utf-8"
+        },
+        "body": generate()
     }
 
 
-def handle_upload(event, origin=None):
+def collect_body(response):
+    """合并流式响应体，返回函数计算可以直接返回的响应"""
+    body = response.get("body")
+    if body is not None and not isinstance(body, (str, bytes)):
+        response["body"] = b"".join(body).decode("utf-8")
+    return response
+
+
+def create_encoded_response(status_code, data, encoding=None, origin=None):
+    """用已序列化（可能已压缩）的响应体创建 HTTP 响应"""
+    headers = {
+        "Content-Type": "application/json; charset=utf-8",
+        "Vary": "Accept-Encoding"
+    }
+    return build_response(status_code, data, encoding, headers)
+
+
+def parse_resume(pdf_data, cache_key, skip=(), deadline=None):
+    """解析 PDF 并提取关键信息，成功时写入缓存；返回 (结果, 错误信息)
+
+    skip 中的可选字段（分页文本、结构化段落）不计算；缓存中已有部分结果时补齐缺少的字段。
+    """
+    # 等待期间其他请求可能已完成解析
+    cached = cache.get(cache_key)
+    if cached is not None and not missing_fields(cached, skip):
+        return cached, None
+    
+    result, error = run_pipeline(resume_parser, info_extractor, pdf_data, cache_key, skip, deadline)
+    if error:
+        return None, error
+    metrics.observe_resume(result)
+    remember_content(pdf_data, cache_key)
+    
+    # 与已缓存的字段合并后写入缓存；降级标记以本次结果为准
+    if cached is not None:
+        degraded = result.get("degraded")
+        result = dict(cached, **result)
+        if not degraded:
+            result.pop("degraded", None)
+    cache.set(cache_key, result)
+    return result, None
+
+
+def content_sha256(pdf_data):
+    """计算 PDF 内容（字节或落盘文件路径）的 SHA-256"""
+    digest = hashlib.sha256()
+    if isinstance(pdf_data, (str, os.PathLike)):
+        with open(pdf_data, "rb") as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(block)
+    else:
+        digest.update(pdf_data)
+    return digest.hexdigest()
+
+
+def remember_content(pdf_data, cache_key):
+    """记录新解析文件的 SHA-256 -> cache_key，供 /upload/check 查询"""
+    try:
+        content_aliases.set(content_sha256(pdf_data), cache_key)
+    except OSError as e:
+        logger.warning(f"记录文件摘要失败: {e}")
+
+
+def lookup_parse_result(cache_key, skip=(), deadline=None):
+    """从缓存读取解析结果；缺少本次请求需要的字段时返回 None（时间预算不足时返回已有的降级结果）"""
+    with stage("cache_get"):
+        result = cache.get(cache_key)
+    if result is None:
+        return None
+    missing = missing_fields(result, skip)
+    if not missing:
+        logger.info(f"命中解析缓存: {cache_key}")
+        return result
+    if deadline is not None and deadline.is_low():
+        # 时间预算不足，不再补齐缺少的字段，直接返回已有结果
+        degraded = list(result.get("degraded", []))
+        degraded += [field for field in missing if field in OPTIONAL_FIELDS]
+        return dict(result, degraded=degraded)
+    return None
+
+
+def get_parse_result(pdf_data, cache_key, skip=(), deadline=None, lookup=True):
+    """根据内容摘要获取解析结果：命中缓存直接返回，否则合并并发请求后解析
+
+    lookup 为 False 表示调用方已经查过缓存，直接解析。
+    """
+    if lookup:
+        result = lookup_parse_result(cache_key, skip, deadline)
+        if result is not None:
+            return result, None
+    
+    # 相同内容的并发上传只解析一次，其余请求共享结果
+    (result, error), shared = upload_flight.do(
+        cache_key, lambda: parse_resume(pdf_data, cache_key, skip, deadline)
+    )
+    if shared:
+        logger.info(f"合并并发上传: {cache_key}")
+        # 共享的结果可能缺少本请求需要的字段，补齐
+        if not error and missing_fields(result, skip):
+            result, error = parse_resume(pdf_data, cache_key, skip, deadline)
+    return result, error
+
+
+def body_cache_key(cache_key, projection, filename=None, encoding=None):
+    return f"{cache_key}|{projection.cache_token()}|{filename or ''}|{encoding or 'identity'}"
+
+
+def make_etag(raw, encoding=None):
+    """由未压缩响应体的摘要生成强 ETag；压缩后的表示使用不同的 ETag"""
+    digest = hashlib.md5(raw).hexdigest()
+    return f'"{digest}-{encoding}"' if encoding else f'"{digest}"'
+
+
+def etag_matches(if_none_match, etag):
+    """If-None-Match 是否匹配 etag（按 RFC 7232 使用弱比较）"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag == etag:
+            return True
+    return False
+
+
+def encode_result(result, projection, filename=None, encoding=None, timings=None, missing=None):
+    """序列化（并按 encoding 压缩）解析结果的响应体，返回 (响应体, 实际编码, ETag)
+
+    missing 为本次请求需要、但结果中没有的字段，列在响应体的 missing_fields 中。
+    """
+    response_body = {
+        "success": True,
+        "message": "简历解析成功",
+        "data": projection.apply(result)
+    }
+    if filename:
+        response_body["filename"] = filename
+    if timings is not None:
+        response_body["timings"] = timings.as_dict()
+    if missing:
+        response_body["missing_fields"] = missing
+    with stage("serialize"):
+        raw = dumps_bytes(response_body)
+    with stage("compress"):
+        data, applied = encode_body(raw, encoding)
+    return data, applied, make_etag(raw, applied)
+
+
+def upload_response(pdf_data, cache_key, filename=None, origin=None, projection=None, accept_encoding=None,
+                    deadline=None):
+    """返回解析结果，序列化后的响应体按投影和编码缓存"""
+    projection = projection or Projection()
+    skip = tuple(field for field in OPTIONAL_FIELDS if not projection.wants(field))
+    
+    # 响应体缓存只在解析结果仍在缓存中时使用，保证之后的 /match 能找到该 cache_key；
+    # 响应体中需要带 timings 时不使用响应体缓存
+    timings = current_timings()
+    use_body_cache = timings is None or not timings.include_body
+    encoding = negotiate(accept_encoding)
+    body_key = body_cache_key(cache_key, projection, filename, encoding)
+    cached_body = body_cache.get(body_key) if use_body_cache else None
+    if cached_body is not None and cache.contains(cache_key):
+        logger.info(f"命中响应体缓存: {cache_key}")
+        return create_encoded_response(200, cached_body[0], cached_body[1], origin)
+    
+    def respond(result, error):
+        if error:
+            return create_response(400, {"error": error}, origin)
+        data, applied, etag = encode_result(result, projection, filename, encoding, None if use_body_cache else timings)
+        if "degraded" not in result and use_body_cache:
+            # 降级结果与本次请求的时间预算有关，不缓存
+            body_cache.set(body_key, (data, applied, etag), size=len(data) + len(body_key))
+        return create_encoded_response(200, data, applied, origin)
+    
+    # 解析缓存命中时只需序列化，不经过准入控制；需要解析 PDF 时才排队获取许可
+    result = lookup_parse_result(cache_key, skip, deadline)
+    if result is not None:
+        return respond(result, None)
+    return run_admitted(lambda: respond(*get_parse_result(pdf_data, cache_key, skip, deadline, lookup=False)), origin)
+
+
+def handle_upload_check(event, origin=None):
+    """上传前查询（POST /upload/check）：按浏览器计算的文件 SHA-256 查找已有的解析结果"""
+    try:
+        json_body = get_json_body(event)
+    except ValueError:
+        return create_response(400, {"error": "请求体不是有效的 JSON"}, origin)
+    sha256 = str(json_body.get("sha256", "") if isinstance(json_body, dict) else "").strip().lower()
+    if len(sha256) != 64 or any(c not in "0123456789abcdef" for c in sha256):
+        return create_response(400, {"error": "sha256 应为 64 位十六进制字符串"}, origin)
+    
+    cache_key = content_aliases.get(sha256)
+    if cache_key is None or not cache.contains(cache_key):
+        return create_response(200, {
+            "success": True,
+            "message": "未找到解析结果，需要上传文件",
+            "data": {"exists": False}
+        }, origin)
+    return create_response(200, {
+        "success": True,
+        "message": "已有解析结果，无需上传",
+        "data": {"exists": True, "cache_key": cache_key, "result_url": f"/result/{cache_key}"}
+    }, origin)
+
+
+def handle_result(event, path, origin=None):
+    """读取已缓存的解析结果（GET /result/{cache_key}），返回强 ETag，If-None-Match 匹配时返回 304"""
+    cache_key = path[len("/result/"):].strip("/")
+    headers = event.get("headers") or {}
+    projection = Projection.from_params(get_query_params(event))
+    encoding = negotiate(get_header(headers, "accept-encoding"))
+    
+    result = cache.get(cache_key) if cache_key else None
+    if result is None:
+        return create_response(404, {"error": "解析结果不存在或已过期，请重新上传"}, origin)
+    
+    skip = tuple(field for field in OPTIONAL_FIELDS if not projection.wants(field))
+    missing = missing_fields(result, skip)
+    if missing:
+        # 缓存的结果是按字段投影解析的，缺少本次请求需要的字段；这里没有 PDF 无法补齐，
+        # 在 missing_fields 中列出后返回，不读写响应体缓存，避免之后的 /upload 命中不完整的响应体
+        data, applied, etag = encode_result(result, projection, None, encoding, missing=missing)
+    else:
+        # 响应体缓存与 /upload（未指定文件名时）共用，命中时不需要重新序列化就能比较 ETag
+        body_key = body_cache_key(cache_key, projection, None, encoding)
+        cached_body = body_cache.get(body_key)
+        if cached_body is not None:
+            data, applied, etag = cached_body
+        else:
+            data, applied, etag = encode_result(result, projection, None, encoding)
+            if "degraded" not in result:
+                body_cache.set(body_key, (data, applied, etag), size=len(data) + len(body_key))
+    
+    response_headers = {"ETag": etag, "Cache-Control": RESULT_CACHE_CONTROL, "Vary": "Accept-Encoding"}
+    if etag_matches(get_header(headers, "if-none-match"), etag):
+        return {"statusCode": 304, "headers": response_headers, "body": ""}
+    response = create_encoded_response(200, data, applied, origin)
+    response["headers"].update(response_headers)
+    return response
+
+
+def handle_upload(event, origin=None, deadline=None):
     """处理简历上传和解析"""
     try:
         # 获取请求体
@@ -56,147 +531,760 @@ def handle_upload(event, origin=None):
         if is_base64:
             body = base64.b64decode(body)
         
-        # 解析 multipart/form-data 或 JSON
-        headers = event.get("headers", {})
-        content_type = headers.get("content-type") or headers.get("Content-Type", "")
+        # 文件名可通过 X-Filename 头（URL 编码）或 filename 查询参数传递
+        headers = event.get("headers") or {}
+        query = get_query_params(event)
+        content_type = get_header(headers, "content-type")
+        filename = unquote(get_header(headers, "x-filename")) or query.get("filename") or None
+        projection = Projection.from_params(query)
+        json_body = {}
         
-        if "multipart/form-data" in content_type:
+        # 解析 PDF 原始二进制、multipart/form-data 或 JSON
+        if content_type.startswith(RAW_PDF_CONTENT_TYPES):
+            # 请求体就是 PDF 本身，不需要额外解码
+            pdf_data = body.encode("utf-8") if isinstance(body, str) else body
+        elif "multipart/form-data" in content_type:
             # 解析 multipart 数据
-            pdf_data = parse_multipart(body, content_type)
+            part = parse_multipart(body, content_type)
+            pdf_data = part.data if part is not None else None
+            filename = filename or (part.filename if part is not None else None)
         elif "application/json" in content_type:
             # JSON 格式，期望 base64 编码的 PDF
-            if isinstance(body, bytes):
-                body = body.decode("utf-8")
-            json_body = json.loads(body)
+            json_body = loads(body)
             pdf_data = base64.b64decode(json_body.get("file", ""))
+            filename = filename or json_body.get("filename")
+            projection = Projection.from_params(query, json_body)
         else:
             return create_response(400, {"error": "不支持的内容类型"}, origin)
         
         if not pdf_data:
             return create_response(400, {"error": "未找到 PDF 文件"}, origin)
         
-        # 解析 PDF
-        logger.info("开始解析 PDF...")
-        parsed_result = resume_parser.parse(pdf_data)
-        
-        if not parsed_result["success"]:
-            return create_response(400, {"error": parsed_result["error"]}, origin)
-        
-        # 提取关键信息
-        logger.info("开始提取关键信息...")
-        extracted_info = info_extractor.extract(parsed_result["text"])
-        
-        # 生成缓存 key
-        import hashlib
+        # 先计算内容摘要，命中缓存时直接返回，跳过解析
         cache_key = hashlib.md5(pdf_data).hexdigest()
+        if is_async_request(event, query, json_body):
+            job_description = json_body.get("job_description") or query.get("job_description")
+            return submit_upload_job(pdf_data, cache_key, filename, projection, job_description, origin)
+        return upload_response(
+            pdf_data, cache_key, filename, origin, projection,
+            get_header(event.get("headers") or {}, "accept-encoding"), deadline
+        )
         
-        # 缓存结果
-        result = {
+    except Exception as e:
+        logger.error(f"处理上传失败: {str(e)}")
+        return create_response(500, {"error": f"处理失败: {str(e)}"}, origin)
+
+
+def is_async_request(event, query, json_body):
+    """请求是否要求异步处理：?async=1、JSON 中 "async": true 或 Prefer: respond-async"""
+    if str(query.get("async", "")).lower() in ("1", "true"):
+        return True
+    if json_body.get("async") is True:
+        return True
+    return "respond-async" in get_header(event.get("headers") or {}, "prefer").lower()
+
+
+def submit_upload_job(pdf_data, cache_key, filename=None, projection=None, job_description=None,
+                      origin=None, cleanup=None):
+    """提交异步解析任务（可选同时匹配岗位），立即返回任务 ID"""
+    projection = projection or Projection()
+    skip = tuple(field for field in OPTIONAL_FIELDS if not projection.wants(field))
+    
+    def run():
+        # 后台解析同样占用准入许可，与同步请求共享 CPU 并发上限；只排队等待，不被拒绝
+        started_at = admission.acquire(block=True) if admission else None
+        try:
+            result, error = get_parse_result(pdf_data, cache_key, skip)
+            if error:
+                return None, error
+            output = {"data": projection.apply(result)}
+            if job_description:
+                output["match"] = match_resume(result["raw_text"], job_description, result["extracted_info"])
+            return output, None
+        finally:
+            if started_at is not None:
+                admission.release(started_at)
+            if cleanup:
+                cleanup()
+    
+    try:
+        job = jobs.submit(run, cache_key=cache_key, filename=filename)
+    except JobQueueFull as e:
+        # 任务未提交，不执行 cleanup：分片上传会话由调用方保留，客户端按 Retry-After 重试
+        logger.warning(f"异步任务被拒绝: {e.message}")
+        return create_response(
+            503, {"error": e.message, "retry_after": e.retry_after}, origin,
+            headers={"Retry-After": str(e.retry_after)}
+        )
+    
+    return create_response(202, {
+        "success": True,
+        "message": "任务已提交",
+        "data": {
+            "job_id": job["job_id"],
+            "status": job["status"],
             "cache_key": cache_key,
-            "raw_text": parsed_result["text"],
-            "pages": parsed_result["pages"],
-            "extracted_info": extracted_info,
-            "structured_text": parsed_result["structured_text"]
+            "status_url": f"/jobs/{job['job_id']}"
         }
-        cache[cache_key] = result
+    }, origin)
+
+
+def handle_job(event, path, origin=None):
+    """查询异步任务状态：GET /jobs/{id}"""
+    job_id = path[len("/jobs/"):].strip("/")
+    job = jobs.get(job_id)
+    if job is None:
+        return create_response(404, {"error": "任务不存在或已过期"}, origin)
+    return create_response(200, {"success": True, "data": job}, origin)
+
+
+def read_batch_files(event):
+    """读取批量上传的文件，返回 [(文件名, PDF 内容), ...]；无效条目的内容为 None"""
+    content_type = get_header(event.get("headers") or {}, "content-type")
+    if "multipart/form-data" in content_type:
+        body = get_body_bytes(event)
+        return [(part.filename, part.data) for part in parse_form(body, content_type) if part.is_file]
+    
+    # JSON：{"files": [{"filename": "...", "file": "<base64>"}, ...]} 或直接是列表
+    json_body = get_json_body(event)
+    entries = json_body.get("files", []) if isinstance(json_body, dict) else json_body
+    files = []
+    for entry in entries:
+        if isinstance(entry, dict):
+            filename, encoded = entry.get("filename"), entry.get("file", "")
+        else:
+            filename, encoded = None, entry
+        try:
+            files.append((filename, base64.b64decode(encoded) or None))
+        except (ValueError, TypeError):
+            files.append((filename, None))
+    return files
+
+
+def iter_batch_items(files, keys, projection, skip=(), deadline=None):
+    """按完成顺序产出批量上传中每个文件的结果：相同内容只处理一次，已缓存的最先返回"""
+    groups = {}
+    for i, key in enumerate(keys):
+        if key is None:
+            yield {"index": i, "filename": files[i][0], "cache_key": None, "success": False, "error": "未找到 PDF 文件"}
+        else:
+            groups.setdefault(key, []).append(i)
+    
+    def emit(key, result, error):
+        first, *duplicates = groups[key]
+        item = {"index": first, "filename": files[first][0], "cache_key": key}
+        if error:
+            item.update({"success": False, "error": error})
+        else:
+            item.update({"success": True, "data": projection.apply(result)})
+        yield item
+        # 重复文件只返回第一次出现的位置
+        for i in duplicates:
+            yield {"index": i, "filename": files[i][0], "cache_key": key,
+                   "success": error is None, "duplicate_of": first}
+    
+    partial = {}
+    pending = []
+    for key, indexes in groups.items():
+        cached = cache.get(key)
+        if cached is not None and not missing_fields(cached, skip):
+            yield from emit(key, cached, None)
+        else:
+            partial[key] = cached
+            pending.append((key, files[indexes[0]][1]))
+    
+    if pending:
+        logger.info(f"批量解析 {len(pending)} 份简历（共 {len(files)} 份）")
+        for key, (result, error) in iter_batch(pending, resume_parser, info_extractor, skip, deadline, reserve_permit):
+            if result is not None:
+                metrics.observe_resume(result)
+                remember_content(files[groups[key][0]][1], key)
+                if partial.get(key) is not None:
+                    result = dict(partial[key], **result)
+                cache.set(key, result)
+            yield from emit(key, result, error)
+
+
+def handle_upload_batch(event, origin=None, deadline=None):
+    """批量上传：按内容去重，缓存未命中的简历在进程池中并行解析"""
+    try:
+        files = read_batch_files(event)
+        if not files:
+            return create_response(400, {"error": "未找到 PDF 文件"}, origin)
+        if len(files) > BATCH_MAX_FILES:
+            return create_response(413, {"error": f"单次最多上传 {BATCH_MAX_FILES} 份简历"}, origin)
+        
+        keys = [hashlib.md5(data).hexdigest() if data else None for _, data in files]
+        projection = Projection.from_params(get_query_params(event))
+        skip = tuple(field for field in OPTIONAL_FIELDS if not projection.wants(field))
+        items = iter_batch_items(files, keys, projection, skip, deadline)
+        
+        if wants_ndjson(event):
+            def lines():
+                succeeded = 0
+                for item in items:
+                    succeeded += item["success"]
+                    yield dict(item, type="result")
+                yield {"type": "summary", "total": len(files), "succeeded": succeeded,
+                       "failed": len(files) - succeeded}
+            return create_stream_response(lines(), origin)
         
+        items = sorted(items, key=lambda item: item["index"])
+        succeeded = sum(1 for item in items if item["success"])
         return create_response(200, {
             "success": True,
-            "message": "简历解析成功",
-            "data": result
+            "message": "批量解析完成",
+            "data": {
+                "total": len(items),
+                "succeeded": succeeded,
+                "failed": len(items) - succeeded,
+                "results": items
+            }
         }, origin)
-        
+    
     except Exception as e:
-        logger.error(f"处理上传失败: {str(e)}")
-        return create_response(500, {"error": f"处理失败: {str(e)}"}, origin)
+        logger.error(f"批量上传失败: {str(e)}")
+        return create_response(500, {"error": f"批量处理失败: {str(e)}"}, origin)
 
 
-def handle_match(event, origin=None):
-    """处理简历与岗位匹配"""
+def handle_upload_session(event, path, http_method, origin=None, deadline=None):
+    """处理分片上传会话：创建 / 上传分片 / 查询进度 / 完成 / 取消"""
     try:
-        body = event.get("body", "")
-        is_base64 = event.get("isBase64Encoded", False)
+        segments = [seg for seg in path.split("/")[3:] if seg]
         
-        if is_base64:
-            body = base64.b64decode(body).decode("utf-8")
-        elif isinstance(body, bytes):
-            body = body.decode("utf-8")
-            
-        json_body = json.loads(body)
+        # POST /upload/session：创建会话
+        if not segments and http_method == "POST":
+            json_body = get_json_body(event)
+            session = upload_sessions.create(json_body.get("filename"), json_body.get("size"))
+            data = session.to_dict()
+            data["chunk_size"] = upload_sessions.chunk_size
+            return create_response(200, {"success": True, "message": "上传会话已创建", "data": data}, origin)
+        
+        if not segments:
+            return create_response(405, {"error": "不支持的请求方法"}, origin)
+        session_id = segments[0]
+        action = segments[1] if len(segments) > 1 else ""
+        
+        # PUT /upload/session/{id}?offset=N：上传分片
+        if not action and http_method == "PUT":
+            offset = get_chunk_offset(event)
+            session = upload_sessions.append(session_id, offset, get_body_bytes(event))
+            return create_response(200, {"success": True, "data": session.to_dict()}, origin)
         
-        # 获取参数
-        cache_key = json_body.get("cache_key", "")
+        # GET /upload/session/{id}：查询已接收的字节数，用于断点续传
+        if not action and http_method == "GET":
+            return create_response(200, {"success": True, "data": upload_sessions.get(session_id).to_dict()}, origin)
+        
+        # DELETE /upload/session/{id}：取消上传
+        if not action and http_method == "DELETE":
+            upload_sessions.discard(session_id)
+            return create_response(200, {"success": True, "message": "上传会话已取消"}, origin)
+        
+        # POST /upload/session/{id}/complete：结束上传并解析
+        if action == "complete" and http_method == "POST":
+            json_body = get_json_body(event)
+            session, data_path, cache_key = upload_sessions.complete(session_id, json_body.get("md5"))
+            query = get_query_params(event)
+            projection = Projection.from_params(query, json_body)
+            if is_async_request(event, query, json_body):
+                # 会话文件在任务结束后删除；任务队列已满时保留会话，客户端按 Retry-After 重新 complete
+                response = submit_upload_job(
+                    data_path, cache_key, session.filename, projection,
+                    json_body.get("job_description"), origin,
+                    cleanup=lambda: upload_sessions.discard(session_id)
+                )
+                if is_overloaded(response):
+                    upload_sessions.reopen(session_id)
+                return response
+            try:
+                # 直接从落盘文件解析，不在内存中拼接完整文件
+                response = upload_response(
+                    data_path, cache_key, session.filename, origin, projection,
+                    get_header(event.get("headers") or {}, "accept-encoding"), deadline
+                )
+            except BaseException:
+                upload_sessions.discard(session_id)
+                raise
+            if is_overloaded(response):
+                # 准入控制拒绝时还没有开始解析：保留会话和已上传的分片，客户端按 Retry-After 重新 complete
+                upload_sessions.reopen(session_id)
+            else:
+                upload_sessions.discard(session_id)
+            return response
+        
+        return create_response(405, {"error": "不支持的请求方法"}, origin)
+    
+    except UploadSessionError as e:
+        return create_response(e.status_code, {"error": e.message}, origin)
+    except Exception as e:
+        logger.error(f"分片上传失败: {str(e)}")
+        return create_response(500, {"error": f"分片上传失败: {str(e)}"}, origin)
+
+
+def resolve_resume(entry):
+    """获取简历文本和提取信息：优先使用缓存，其次使用请求中直接提供的数据；缺失时返回 (None, None)"""
+    cache_key = entry.get("cache_key", "")
+    cached_data = cache.get(cache_key) if cache_key else None
+    if cached_data:
+        return cached_data["raw_text"], cached_data["extracted_info"]
+    resume_text = entry.get("resume_text", "")
+    if not resume_text:
+        return None, None
+    return resume_text, entry.get("extracted_info", {})
+
+
+def normalize_job_description(job_description):
+    """规范化岗位描述（统一换行、去掉首尾空白），内容相同的描述得到相同的匹配缓存键"""
+    return (job_description or "").replace("\r\n", "\n").strip()
+
+
+def lookup_match(resume_text, job_description, extracted_info=None):
+    """按简历内容、规范化岗位描述和评分器版本查找匹配结果缓存，返回 (缓存键, 结果)，未命中时结果为 None"""
+    with stage("match_cache"):
+        resume_hash = hashlib.md5(dumps_bytes([resume_text, extracted_info or {}])).hexdigest()
+        job_hash = hashlib.md5(normalize_job_description(job_description).encode("utf-8")).hexdigest()
+        key = f"{resume_matcher.version}|{resume_hash}|{job_hash}"
+        cached = match_cache.get(key)
+    if cached is not None:
+        logger.info("命中匹配结果缓存")
+    return key, cached
+
+
+def match_resume(resume_text, job_description, extracted_info=None, deadline=None, job_profile=None, key=None):
+    """计算匹配度；相同简历内容、岗位描述和评分器版本的结果直接从缓存返回（不可修改返回值）
+
+    job_profile 为已注册的岗位画像时不再分析岗位描述；key 为 lookup_match 返回的缓存键（调用方已查过缓存）。
+    """
+    job_description = normalize_job_description(job_description)
+    if key is None:
+        key, cached = lookup_match(resume_text, job_description, extracted_info)
+        if cached is not None:
+            return cached
+    
+    if job_profile is not None:
+        result = resume_matcher.match_job(resume_text, job_profile, extracted_info, deadline)
+    else:
+        result = resume_matcher.match(resume_text, job_description, extracted_info, deadline)
+    if "degraded" not in result:
+        # 降级结果与本次请求的时间预算有关，不缓存
+        match_cache.set(key, result)
+    return result
+
+
+def register_job(job_description):
+    """分析岗位描述并注册为可复用的岗位画像；jd_id 是规范化描述的摘要，相同描述重复注册得到同一个 jd_id
+
+    无效的描述（profile["valid"] 为 False）只返回分析结果，不保存。
+    """
+    job_description = normalize_job_description(job_description)
+    jd_id = hashlib.md5(job_description.encode("utf-8")).hexdigest()
+    entry = job_registry.get(jd_id)
+    if entry is None or entry["version"] != resume_matcher.version:
+        entry = {
+            "jd_id": jd_id,
+            "job_description": job_description,
+            "version": resume_matcher.version,
+            "profile": resume_matcher.analyze_job(job_description)
+        }
+    if entry["profile"]["valid"]:
+        # 重新写入以延长有效期
+        job_registry.set(jd_id, entry)
+    return entry
+
+
+def get_registered_job(jd_id):
+    """按 jd_id 获取已注册的岗位；评分器版本变化后用保存的描述重新分析，不存在或已无效时返回 None"""
+    entry = job_registry.get(jd_id)
+    if entry is None:
+        return None
+    if entry["version"] != resume_matcher.version:
+        entry = register_job(entry["job_description"])
+    if not entry["profile"]["valid"]:
+        # 新版本评分器认为该描述无效，删除旧的注册记录
+        job_registry.delete(jd_id)
+        return None
+    return entry
+
+
+def resolve_job(entry):
+    """获取岗位描述和岗位画像：有 jd_id 时使用已注册的画像，否则使用 job_description（画像为 None，由调用方分析）
+
+    jd_id 不存在或已过期时返回 (None, None)。
+    """
+    jd_id = entry.get("jd_id")
+    if jd_id:
+        registered = get_registered_job(str(jd_id))
+        if registered is None:
+            return None, None
+        return registered["job_description"], registered["profile"]
+    return entry.get("job_description", ""), None
+
+
+def handle_register_job(event, origin=None):
+    """注册岗位描述（POST /jd）：分析一次，返回 jd_id 和岗位画像，之后的匹配请求用 jd_id 代替 job_description"""
+    try:
+        json_body = get_json_body(event)
         job_description = json_body.get("job_description", "")
-        resume_text = json_body.get("resume_text", "")
-        extracted_info = json_body.get("extracted_info", {})
+        if not job_description:
+            return create_response(400, {"error": "缺少岗位描述"}, origin)
+        
+        entry = register_job(job_description)
+        profile = entry["profile"]
+        if not profile["valid"]:
+            return create_response(400, {"error": profile["reason"]}, origin)
+        
+        return create_response(200, {
+            "success": True,
+            "message": "岗位描述已注册",
+            "data": dict(profile, jd_id=entry["jd_id"], expires_in=int(JD_TTL_SECONDS))
+        }, origin)
+    
+    except Exception as e:
+        logger.error(f"注册岗位描述失败: {str(e)}")
+        return create_response(500, {"error": f"注册岗位描述失败: {str(e)}"}, origin)
+
+
+def get_int_param(params, name, default, minimum=0, maximum=None):
+    """读取整数参数并限制范围"""
+    value = params.get(name)
+    if value is None or value == "":
+        return default
+    value = max(minimum, int(value))
+    return min(value, maximum) if maximum is not None else value
+
+
+def handle_match(event, origin=None, deadline=None):
+    """处理简历与岗位匹配"""
+    try:
+        json_body = get_json_body(event)
+        
+        # 获取参数（jd_id 为 POST /jd 注册的岗位，可代替 job_description）
+        job_description, job_profile = resolve_job(json_body)
+        if job_description is None:
+            return create_response(404, {"error": "岗位描述不存在或已过期，请重新注册"}, origin)
         
         if not job_description:
             return create_response(400, {"error": "缺少岗位描述"}, origin)
         
         # 优先使用缓存的简历数据
-        if cache_key and cache_key in cache:
-            cached_data = cache[cache_key]
-            resume_text = cached_data["raw_text"]
-            extracted_info = cached_data["extracted_info"]
-        elif not resume_text:
+        resume_text, extracted_info = resolve_resume(json_body)
+        if resume_text is None:
             return create_response(400, {"error": "缺少简历数据，请先上传简历或提供 cache_key"}, origin)
         
-        # 计算匹配度
+        projection = Projection.from_params(get_query_params(event), json_body)
+        
+        def respond(match_result):
+            return create_response(200, {
+                "success": True,
+                "message": "匹配分析完成",
+                "data": projection.apply(match_result)
+            }, origin)
+        
+        # 缓存命中时直接返回，不经过准入控制；需要计算时才排队获取许可
+        key, match_result = lookup_match(resume_text, job_description, extracted_info)
+        if match_result is not None:
+            return respond(match_result)
         logger.info("开始计算匹配度...")
-        match_result = resume_matcher.match(resume_text, job_description, extracted_info)
+        return run_admitted(
+            lambda: respond(match_resume(resume_text, job_description, extracted_info, deadline, job_profile, key)),
+            origin
+        )
+        
+    except Exception as e:
+        logger.error(f"匹配分析失败: {str(e)}")
+        return create_response(500, {"error": f"匹配分析失败: {str(e)}"}, origin)
+
+
+def sort_by_score(items, top_k=0):
+    """总分从高到低排序，同分保持提交顺序；top_k 大于 0 时只保留前 top_k 个"""
+    items = sorted(items, key=lambda item: (-item["overall_score"], item["index"]))
+    return items[:top_k] if top_k else items
+
+
+def ranking_summary(items, top_k=0):
+    """NDJSON 结尾的排名汇总（流式返回时各条结果按完成顺序输出，名次在最后给出）"""
+    return [
+        {"rank": rank, "index": item["index"], "id": item["id"], "overall_score": item["overall_score"]}
+        for rank, item in enumerate(sort_by_score(items, top_k), start=1)
+    ]
+
+
+def stream_ranked(items, summary, top_k=0):
+    """逐条产出结果 / 错误行，最后产出带排名的汇总行"""
+    scored = []
+    for item in items:
+        if "error" in item:
+            yield dict(item, type="error")
+        else:
+            scored.append(item)
+            yield dict(item, type="result")
+    summary.update({"type": "summary", "total": len(scored), "ranking": ranking_summary(scored, top_k)})
+    yield summary
+
+
+def iter_multi_items(positions, resume_profile, deadline=None):
+    """依次计算简历与每个岗位的匹配结果，岗位描述无效时产出错误条目"""
+    for i, position in positions:
+        position_id = position.get("id") or str(i)
+        job_description, job_profile = resolve_job(position)
+        if job_description is None:
+            yield {"index": i, "id": position_id, "error": "岗位描述不存在或已过期，请重新注册"}
+            continue
+        if job_profile is None:
+            job_profile = resume_matcher.analyze_job(job_description)
+        if not job_profile["valid"]:
+            yield {"index": i, "id": position_id, "error": job_profile["reason"]}
+            continue
+        match_result = resume_matcher.score(resume_profile, job_profile, deadline)
+        yield {
+            "index": i,
+            "id": position_id,
+            "title": position.get("title"),
+            "overall_score": match_result["overall_score"],
+            "match": match_result
+        }
+
+
+def handle_match_multi(event, origin=None, deadline=None):
+    """一份简历匹配多个岗位：简历只分析一次，按总分从高到低返回岗位"""
+    try:
+        json_body = get_json_body(event)
+        
+        # 岗位可以是字符串，也可以是 {id, title, job_description 或 jd_id}
+        positions = []
+        for i, position in enumerate(json_body.get("jobs", [])):
+            if isinstance(position, str):
+                position = {"job_description": position}
+            positions.append((i, position))
+        if not positions:
+            return create_response(400, {"error": "缺少岗位列表"}, origin)
+        if len(positions) > MULTI_MAX_JOBS:
+            return create_response(413, {"error": f"单次最多匹配 {MULTI_MAX_JOBS} 个岗位"}, origin)
+        
+        resume_text, extracted_info = resolve_resume(json_body)
+        if resume_text is None:
+            return create_response(400, {"error": "缺少简历数据，请先上传简历或提供 cache_key"}, origin)
+        
+        try:
+            params = dict(json_body, **get_query_params(event))
+            top_k = get_int_param(params, "top_k", 0)
+        except (TypeError, ValueError):
+            return create_response(400, {"error": "top_k 参数无效"}, origin)
+        
+        # 简历只分析一次
+        logger.info(f"开始匹配 {len(positions)} 个岗位...")
+        resume_profile = resume_matcher.analyze_resume(resume_text, extracted_info)
+        items = iter_multi_items(positions, resume_profile, deadline)
+        
+        if wants_ndjson(event):
+            summary = {"resume_skills": resume_profile["skills"]}
+            return create_stream_response(stream_ranked(items, summary, top_k), origin)
+        
+        results = []
+        errors = []
+        for item in items:
+            (errors if "error" in item else results).append(item)
+        results = sort_by_score(results, top_k)
+        for rank, item in enumerate(results, start=1):
+            item["rank"] = rank
         
         return create_response(200, {
             "success": True,
-            "message": "匹配分析完成",
-            "data": match_result
+            "message": "多岗位匹配完成",
+            "data": {
+                "total": len(results),
+                "resume_skills": resume_profile["skills"],
+                "results": results,
+                "errors": errors
+            }
         }, origin)
-        
+    
     except Exception as e:
-        logger.error(f"匹配分析失败: {str(e)}")
-        return create_response(500, {"error": f"匹配分析失败: {str(e)}"}, origin)
+        logger.error(f"多岗位匹配失败: {str(e)}")
+        return create_response(500, {"error": f"多岗位匹配失败: {str(e)}"}, origin)
 
 
-def parse_multipart(body, content_type):
-    """解析 multipart/form-data 数据"""
+def iter_rank_items(entries, job_profile, deadline=None):
+    """依次计算每份简历与岗位的匹配结果，重复的 cache_key 只计算一次"""
+    seen = set()
+    for i, entry in enumerate(entries):
+        cache_key = entry.get("cache_key") or None
+        resume_id = entry.get("id") or cache_key or str(i)
+        if cache_key and cache_key in seen:
+            continue
+        if cache_key:
+            seen.add(cache_key)
+        
+        resume_text, extracted_info = resolve_resume(entry)
+        if resume_text is None:
+            yield {"index": i, "id": resume_id, "error": "简历数据不存在或已过期"}
+            continue
+        
+        match_result = resume_matcher.match_job(resume_text, job_profile, extracted_info, deadline)
+        yield {
+            "index": i,
+            "id": resume_id,
+            "cache_key": cache_key,
+            "name": ((extracted_info or {}).get("basic_info") or {}).get("name"),
+            "overall_score": match_result["overall_score"],
+            "match": match_result
+        }
+
+
+def handle_rank(event, origin=None, deadline=None):
+    """按岗位描述对多份简历排序：岗位描述只分析一次，返回按总分排序的分页结果"""
     try:
-        # 获取 boundary
-        boundary = None
-        for part in content_type.split(";"):
-            part = part.strip()
-            if part.startswith("boundary="):
-                boundary = part[9:].strip('"')
-                break
+        json_body = get_json_body(event)
+        job_description, job_profile = resolve_job(json_body)
+        if job_description is None:
+            return create_response(404, {"error": "岗位描述不存在或已过期，请重新注册"}, origin)
+        if not job_description:
+            return create_response(400, {"error": "缺少岗位描述"}, origin)
         
-        if not boundary:
-            return None
-        
-        if isinstance(body, str):
-            body = body.encode("utf-8")
-        
-        boundary_bytes = boundary.encode("utf-8")
-        parts = body.split(b"--" + boundary_bytes)
-        
-        for part in parts:
-            if b"Content-Disposition" in part and b"filename" in part:
-                # 找到文件部分
-                header_end = part.find(b"\r\n\r\n")
-                if header_end != -1:
-                    file_data = part[header_end + 4:]
-                    # 移除尾部的 boundary 标记
-                    if file_data.endswith(b"\r\n"):
-                        file_data = file_data[:-2]
-                    if file_data.endswith(b"--"):
-                        file_data = file_data[:-2]
-                    if file_data.endswith(b"\r\n"):
-                        file_data = file_data[:-2]
-                    return file_data
+        # 简历可以是 cache_key 列表，也可以是 {cache_key | resume_text + extracted_info, id} 列表
+        entries = [{"cache_key": key} for key in json_body.get("cache_keys", [])]
+        for entry in json_body.get("resumes", []):
+            entries.append({"cache_key": entry} if isinstance(entry, str) else entry)
+        if not entries:
+            return create_response(400, {"error": "缺少简历列表"}, origin)
+        if len(entries) > RANK_MAX_RESUMES:
+            return create_response(413, {"error": f"单次最多排序 {RANK_MAX_RESUMES} 份简历"}, origin)
         
-        return None
+        try:
+            params = dict(json_body, **get_query_params(event))
+            top_k = get_int_param(params, "top_k", 0)
+            offset = get_int_param(params, "offset", 0)
+            limit = get_int_param(params, "limit", RANK_DEFAULT_LIMIT, minimum=1, maximum=RANK_MAX_LIMIT)
+        except (TypeError, ValueError):
+            return create_response(400, {"error": "分页参数无效"}, origin)
+        
+        # 岗位描述只分析一次（已注册的岗位直接使用保存的画像）
+        if job_profile is None:
+            job_profile = resume_matcher.analyze_job(job_description)
+        if not job_profile["valid"]:
+            return create_response(400, {"error": job_profile["reason"]}, origin)
+        
+        logger.info(f"开始排序 {len(entries)} 份简历...")
+        items = iter_rank_items(entries, job_profile, deadline)
+        
+        if wants_ndjson(event):
+            # 流式返回不分页，汇总行给出全部（或前 top_k 个）名次
+            summary = {"job_skills": job_profile["skills"]}
+            return create_stream_response(stream_ranked(items, summary, top_k), origin)
+        
+        ranked = []
+        errors = []
+        for item in items:
+            (errors if "error" in item else ranked).append(item)
+        ranked = sort_by_score(ranked, top_k)
+        page = ranked[offset:offset + limit]
+        for rank, item in enumerate(page, start=offset + 1):
+            item["rank"] = rank
+        
+        return create_response(200, {
+            "success": True,
+            "message": "简历排序完成",
+            "data": {
+                "total": len(ranked),
+                "offset": offset,
+                "limit": limit,
+                "job_skills": job_profile["skills"],
+                "results": page,
+                "errors": errors
+            }
+        }, origin)
+    
+    except Exception as e:
+        logger.error(f"简历排序失败: {str(e)}")
+        return create_response(500, {"error": f"简历排序失败: {str(e)}"}, origin)
+
+
+def parse_multipart(body, content_type):
+    """解析 multipart/form-data 数据，返回文件字段（内容是请求体上的 memoryview，不复制）"""
+    try:
+        return find_file_part(body, content_type)
     except Exception as e:
         logger.error(f"解析 multipart 失败: {str(e)}")
         return None
 
 
+def get_body_bytes(event):
+    """读取请求体为字节"""
+    body = event.get("body") or b""
+    if event.get("isBase64Encoded", False):
+        return base64.b64decode(body)
+    if isinstance(body, str):
+        return body.encode("utf-8")
+    return body
+
+
+def get_json_body(event):
+    """读取 JSON 请求体，空请求体返回空字典"""
+    body = get_body_bytes(event)
+    if not body:
+        return {}
+    return loads(body)
+
+
+def get_chunk_offset(event):
+    """获取分片偏移量：优先 offset 查询参数，其次 Content-Range 头"""
+    offset = get_query_params(event).get("offset")
+    if offset is None:
+        content_range = get_header(event.get("headers") or {}, "content-range")
+        # Content-Range: bytes 0-1048575/5242880
+        if content_range.startswith("bytes "):
+            offset = content_range[6:].split("-", 1)[0]
+    try:
+        return int(offset or 0)
+    except ValueError:
+        raise UploadSessionError(400, "分片偏移量无效")
+
+
+def wants_ndjson(event):
+    """客户端是否请求 NDJSON 流式结果（Accept: application/x-ndjson）"""
+    return "application/x-ndjson" in get_header(event.get("headers") or {}, "accept").lower()
+
+
+def metric_route(path):
+    """指标中使用的路由名：路径中的 ID 替换为占位符，未知路径记为 other"""
+    if path.startswith("/jobs/"):
+        return "/jobs/{id}"
+    if path.startswith("/result/"):
+        return "/result/{cache_key}"
+    if path.startswith("/upload/session/"):
+        return "/upload/session/{id}/complete" if path.endswith("/complete") else "/upload/session/{id}"
+    return path if path in METRIC_ROUTES else "other"
+
+
+def wants_timings(event):
+    """响应体中是否带 timings 字段（?timings=1）；Server-Timing 头总是返回"""
+    return str(get_query_params(event).get("timings", "")).lower() in ("1", "true")
+
+
+def get_header(headers, name):
+    """不区分大小写地读取请求头"""
+    value = headers.get(name)
+    if value is None:
+        name = name.lower()
+        for key, val in headers.items():
+            if key.lower() == name:
+                value = val
+                break
+    return value or ""
+
+
+def get_query_params(event):
+    """获取查询参数（兼容 FC HTTP 触发器和 API 网关事件格式）"""
+    params = event.get("queryParameters") or event.get("queryStringParameters")
+    if params:
+        return {k: (v[0] if isinstance(v, list) else v) for k, v in params.items()}
+    raw = event.get("rawQueryString") or ""
+    if not raw:
+        path = event.get("rawPath") or event.get("path") or event.get("requestURI") or ""
+        raw = path.split("?", 1)[1] if "?" in path else ""
+    return {k: v[0] for k, v in parse_qs(raw, keep_blank_values=True).items()}
+
+
 def get_origin(event):
     """获取请求的 Origin"""
     headers = event.get("headers", {})
@@ -205,14 +1293,114 @@ def get_origin(event):
     return origin
 
 
+def route_request(event, http_method, path, origin=None, deadline=None):
+    """路由分发，返回 FC 响应；deadline 为本次请求的时间预算"""
+    # 健康检查不需要初始化组件
+    if path == "/health" or path == "/" or path == "":
+        return create_response(200, {
+            "success": True,
+            "message": "简历分析 API 服务运行正常",
+            "version": "1.0.0",
+            "json_encoder": JSON_BACKEND,
+            "cache": cache.stats(),
+            "body_cache": body_cache.stats(),
+            "match_cache": match_cache.stats(),
+            "jobs": jobs.stats(),
+            "warmup": cold_start.snapshot(),
+            "admission": admission.stats() if admission else None,
+            "compression": compression_stats.snapshot(),
+            "endpoints": {
+                "GET /metrics": "Prometheus 格式的运行指标",
+                "POST /upload": "上传并解析简历",
+                "POST /upload/check": "上传前按文件 SHA-256 查询是否已有解析结果",
+                "POST /upload/batch": "批量上传并解析简历",
+                "POST /upload/session": "创建分片上传会话（PUT 分片，POST /complete 结束）",
+                "POST /jd": "注册岗位描述，返回可在匹配接口中复用的 jd_id",
+                "POST /match": "简历与岗位匹配评分",
+                "POST /match/multi": "一份简历匹配多个岗位",
+                "POST /rank": "按岗位描述对多份简历排序",
+                "GET /jobs/{id}": "查询异步解析任务（上传时加 ?async=1）",
+                "GET /result/{cache_key}": "读取已缓存的解析结果（支持 ETag / If-None-Match）"
+            }
+        }, origin)
+    
+    if path == "/metrics" and http_method == "GET":
+        return {
+            "statusCode": 200,
+            "headers": {"Content-Type": "text/plain; version=0.0.4; charset=utf-8"},
+            "body": metrics.registry.render()
+        }
+    
+    # 读取缓存结果不需要解析组件
+    if path.startswith("/result/") and http_method == "GET":
+        return handle_result(event, path, origin)
+    if path == "/upload/check" and http_method == "POST":
+        return handle_upload_check(event, origin)
+    
+    # 其他路由需要初始化组件
+    try:
+        init_components()
+    except Exception as e:
+        logger.error(f"初始化失败: {e}")
+        import traceback
+        logger.error(traceback.format_exc())
+        return create_response(500, {"error": f"服务初始化失败: {str(e)}"}, origin)
+    
+    # 路由处理（解析和匹配是 CPU 密集操作，经过准入控制；/upload、分片上传的 complete 和 /match
+    # 先查缓存，只有需要解析或计算时才获取许可）
+    if path == "/upload" and http_method == "POST":
+        return handle_upload(event, origin, deadline)
+    elif path == "/upload/batch" and http_method == "POST":
+        return run_admitted(lambda: handle_upload_batch(event, origin, deadline), origin)
+    elif path.startswith("/upload/session") and path.endswith("/complete"):
+        return handle_upload_session(event, path, http_method, origin, deadline)
+    elif path.startswith("/upload/session"):
+        return handle_upload_session(event, path, http_method, origin)
+    elif path == "/match" and http_method == "POST":
+        return handle_match(event, origin, deadline)
+    elif path == "/match/multi" and http_method == "POST":
+        return run_admitted(lambda: handle_match_multi(event, origin, deadline), origin)
+    elif path == "/rank" and http_method == "POST":
+        return run_admitted(lambda: handle_rank(event, origin, deadline), origin)
+    elif path == "/jd" and http_method == "POST":
+        return handle_register_job(event, origin)
+    elif path.startswith("/jobs/") and http_method == "GET":
+        return handle_job(event, path, origin)
+    else:
+        # 返回调试信息帮助排查路由问题
+        return create_response(404, {
+            "error": f"接口不存在: {path}",
+            "debug": {
+                "received_path": path,
+                "method": http_method,
+                "event_keys": list(event.keys()),
+                "rawPath": event.get("rawPath"),
+                "path_field": event.get("path")
+            }
+        }, origin)
+
+
 def handler(event, context):
     """阿里云函数计算入口"""
+    function = getattr(context, "function", None)
+    return handle_event(event, function_timeout=getattr(function, "timeout", None))
+
+
+def get_deadline(event, function_timeout=None):
+    """按 X-Request-Timeout 头或 timeout 查询参数（秒）、默认预算和函数超时创建时间预算"""
+    requested = get_header(event.get("headers") or {}, "x-request-timeout") or get_query_params(event).get("timeout")
+    try:
+        return Deadline.from_request(requested, function_timeout)
+    except (TypeError, ValueError):
+        return Deadline.from_request(None, function_timeout)
+
+
+def handle_event(event, stream=False, function_timeout=None):
+    """处理一个 FC 格式的事件；stream=True 时 NDJSON 响应体保持为迭代器，由调用方逐行写出"""
     try:
         # 解析事件
-        if isinstance(event, str):
-            event = json.loads(event)
-        elif isinstance(event, bytes):
-            event = json.loads(event.decode("utf-8"))
+        if isinstance(event, (str, bytes)):
+            event = loads(event)
     except Exception as e:
         logger.error(f"解析事件失败: {e}")
         return {
@@ -220,7 +1408,7 @@ def handler(event, context):
             "headers": {
                 "Content-Type": "application/json; charset=utf-8"
             },
-            "body": json.dumps({"error": "Invalid request"})
+            "body": dumps({"error": "Invalid request"})
         }
     
     # 获取 HTTP 方法和路径
@@ -234,7 +1422,7 @@ def handler(event, context):
             "headers": {
                 "Content-Type": "application/json; charset=utf-8"
             },
-            "body": json.dumps({"message": "OK"})
+            "body": dumps({"message": "OK"})
         }
     
     # 其他请求才需要初始化组件
@@ -254,44 +1442,32 @@ def handler(event, context):
         
         logger.info(f"收到请求: {http_method} {path}")
         
-        # 健康检查不需要初始化组件
-        if path == "/health" or path == "/" or path == "":
-            return create_response(200, {
-                "success": True,
-                "message": "简历分析 API 服务运行正常",
-                "version": "1.0.0",
-                "endpoints": {
-                    "POST /upload": "上传并解析简历",
-                    "POST /match": "简历与岗位匹配评分"
-                }
-            }, origin)
-        
-        # 其他路由需要初始化组件
+        deadline = get_deadline(event, function_timeout)
+        timings, token = begin_timings(wants_timings(event))
+        route = metric_route(path)
+        started_at = time.perf_counter()
+        status = 500
+        metrics.requests_in_flight.inc()
         try:
-            init_components()
-        except Exception as e:
-            logger.error(f"初始化失败: {e}")
-            import traceback
-            logger.error(traceback.format_exc())
-            return create_response(500, {"error": f"服务初始化失败: {str(e)}"}, origin)
-        
-        # 路由处理
-        if path == "/upload" and http_method == "POST":
-            return handle_upload(event, origin)
-        elif path == "/match" and http_method == "POST":
-            return handle_match(event, origin)
-        else:
-            # 返回调试信息帮助排查路由问题
-            return create_response(404, {
-                "error": f"接口不存在: {path}",
-                "debug": {
-                    "received_path": path,
-                    "method": http_method,
-                    "event_keys": list(event.keys()),
-                    "rawPath": event.get("rawPath"),
-                    "path_field": event.get("path")
-                }
-            }, origin)
+            response = route_request(event, http_method, path, origin, deadline)
+            if not stream or isinstance(response.get("body"), (str, bytes, type(None))):
+                response = collect_body(response)
+                
+                # 按 Accept-Encoding 压缩较大的响应体
+                accept_encoding = get_header(event.get("headers") or {}, "accept-encoding")
+                with stage("compress"):
+                    response = compress_response(response, accept_encoding)
+            status = response.get("statusCode", 200)
+        finally:
+            end_timings(token)
+            metrics.requests_in_flight.dec()
+            metrics.request_duration.observe(time.perf_counter() - started_at, route=route)
+            metrics.requests_total.inc(route=route, method=http_method, status=status)
+            metrics.observe_stages(timings)
+        
+        if timings is not None:
+            response.setdefault("headers", {})["Server-Timing"] = timings.header()
+        return response
             
     except Exception as e:
         logger.error(f"处理请求失败: {str(e)}")
@@ -302,6 +1478,6 @@ def handler(event, context):
             "headers": {
                 "Content-Type": "application/json; charset=utf-8"
             },
-            "body": json.dumps({"error": f"服务器内部错误: {str(e)}"}, ensure_ascii=False)
+            "body": dumps({"error": f"服务器内部错误: {str(e)}"})
         }
 
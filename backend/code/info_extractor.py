@@ -5,6 +5,8 @@
 import re
 import logging
 from skills import get_skill_keywords_titlecase
+from deadline import allows
+from timing import stage
 
 logger = logging.getLogger(__name__)
 
@@ -15,25 +17,39 @@ class InfoExtractor:
     def __init__(self):
         pass
     
-    def extract(self, text):
-        """从简历文本中提取关键信息"""
+    def extract(self, text, deadline=None):
+        """从简历文本中提取关键信息
+
+        deadline 剩余时间不足时跳过匹配评分用不到的字段（地址、求职意向、毕业院校），对应值为 None。
+        """
         # 先清理文本，合并分散的字符
-        cleaned_text = self._clean_scattered_text(text)
+        with stage("clean_scattered_text"):
+            cleaned_text = self._clean_scattered_text(text)
         
-        result = {
-            "basic_info": {
+        with stage("extract_fields"):
+            basic_info = {
                 "name": self._extract_name(cleaned_text),
                 "phone": self._extract_phone(cleaned_text, text),
                 "email": self._extract_email(cleaned_text, text),
                 "address": self._extract_address(cleaned_text)
-            },
-            "optional_info": {
-                "job_intention": self._extract_job_intention(cleaned_text),
+                if allows(deadline, "extracted_info.basic_info.address") else None
+            }
+            optional_info = {
+                "job_intention": self._extract_job_intention(cleaned_text)
+                if allows(deadline, "extracted_info.optional_info.job_intention") else None,
                 "experience_years": self._extract_experience(cleaned_text),
                 "education": self._extract_education(cleaned_text),
                 "university": self._extract_university(cleaned_text)
-            },
-            "skills": self._extract_skills(cleaned_text),
+                if allows(deadline, "extracted_info.optional_info.university") else None
+            }
+        
+        with stage("extract_skills"):
+            skills = self._extract_skills(cleaned_text)
+        
+        result = {
+            "basic_info": basic_info,
+            "optional_info": optional_info,
+            "skills": skills,
             "extraction_method": "regex"
         }
         return result
@@ -295,12 +311,8 @@ class InfoExtractor:
         text_cleaned = re.sub(r'(\w) (\w)', r'\1\2', text_cleaned)
         text_lower = text_cleaned.lower()
         
-        found = []
-        for skill in skill_keywords:
-            # 使用单词边界或直接匹配
-            if re.search(r'\b' + re.escape(skill.lower()) + r'\b', text_lower):
-                found.append(skill)
-            elif skill.lower() in text_lower:
-                found.append(skill)
+        # 单词边界匹配的结果一定包含在子串匹配中，只需判断子串
+        # （逐个关键词构造正则会超出 re 模块的编译缓存，每次提取都重新编译）
+        found = [skill for skill in skill_keywords if skill.lower() in text_lower]
         
         return list(set(found))
@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+"""
+异步任务模块 - 耗时的解析请求在后台线程池中执行，客户端通过任务 ID 轮询状态
+
+任务状态保存在缓存后端中（CACHE_BACKEND 为 sqlite / redis 时不经过进程内一级缓存），
+多实例部署时任意实例都能查询任务状态。
+"""
+import os
+import math
+import time
+import uuid
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from cache_backends import create_cache_backend
+
+logger = logging.getLogger(__name__)
+
+JOB_WORKERS = int(os.environ.get("JOB_WORKERS", "2"))
+JOB_MAX_PENDING = int(os.environ.get("JOB_MAX_PENDING", "100"))
+JOB_TTL = float(os.environ.get("JOB_TTL_SECONDS", "3600"))
+
+# 任务状态
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+
+class JobQueueFull(Exception):
+    """待执行任务过多，retry_after 为建议的重试等待秒数"""
+
+    def __init__(self, message, retry_after):
+        super().__init__(message)
+        self.message = message
+        self.retry_after = retry_after
+
+
+class JobManager:
+    """提交任务、更新和查询任务状态"""
+
+    def __init__(self, store=None, workers=None, max_pending=None, ttl=None):
+        self.ttl = JOB_TTL if ttl is None else ttl
+        self.store = store or create_cache_backend("jobs", local_cache=False, ttl=self.ttl, max_entries=1024)
+        self.workers = workers or JOB_WORKERS
+        self.max_pending = max_pending or JOB_MAX_PENDING
+        self._executor = None
+        self._pending = 0
+        self._lock = threading.Lock()
+        # 任务耗时的平滑值（秒），用于估算 Retry-After
+        self.latency = 0.0
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="job")
+            return self._executor
+
+    def submit(self, fn, **meta):
+        """提交任务，fn 返回 (结果字典, 错误信息)；meta 会写入任务记录"""
+        with self._lock:
+            if self._pending >= self.max_pending:
+                # 任意一个任务结束即可腾出位置，按平均耗时和工作线程数估算
+                retry_after = max(1, math.ceil((self.latency or 1.0) / self.workers))
+                raise JobQueueFull(f"待处理任务过多（{self._pending}），请稍后重试", retry_after)
+            self._pending += 1
+
+        now = time.time()
+        job = {
+            "job_id": uuid.uuid4().hex,
+            "status": QUEUED,
+            "created_at": now,
+            "updated_at": now,
+        }
+        job.update(meta)
+        self._save(job)
+        try:
+            self._get_executor().submit(self._run, job, fn)
+        except RuntimeError:
+            with self._lock:
+                self._pending -= 1
+            raise
+        logger.info(f"提交异步任务: {job['job_id']}")
+        return job
+
+    def get(self, job_id):
+        """查询任务，不存在或已过期时返回 None"""
+        if not job_id or not job_id.isalnum():
+            return None
+        return self.store.get(job_id)
+
+    def stats(self):
+        with self._lock:
+            return {"pending": self._pending, "workers": self.workers, "max_pending": self.max_pending}
+
+    def shutdown(self, wait=True):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
+    def _run(self, job, fn):
+        start = time.time()
+        self._save(dict(job, status=RUNNING, updated_at=start))
+        try:
+            result, error = fn()
+        except Exception as e:
+            logger.error(f"异步任务失败: {job['job_id']}: {e}")
+            result, error = None, f"处理失败: {str(e)}"
+        finally:
+            elapsed = time.time() - start
+            with self._lock:
+                self._pending -= 1
+                self.latency = elapsed if not self.latency else 0.8 * self.latency + 0.2 * elapsed
+
+        finished = dict(job, updated_at=time.time(), duration=round(time.time() - start, 3))
+        if error:
+            finished.update(status=FAILED, error=error)
+        else:
+            finished.update(result or {})
+            finished["status"] = SUCCEEDED
+        self._save(finished)
+        logger.info(f"异步任务结束: {job['job_id']} ({finished['status']})")
+
+    def _save(self, job):
+        # 每次写入新的字典，读取方不会看到修改到一半的记录
+        self.store.set(job["job_id"], job, ttl=self.ttl)
@@ -3,19 +3,55 @@
 简历与岗位匹配评分模块
 """
 import re
+import hashlib
 import logging
+import skills
 from skills import get_skill_keywords_lowercase
+from deadline import allows
+from timing import stage
 
 logger = logging.getLogger(__name__)
 
 
+def _scorer_version():
+    """评分器版本：本模块和技能词库源码的摘要，部署修改后的 matcher.py / skills.py 时自动变化"""
+    digest = hashlib.md5()
+    try:
+        for path in (__file__, skills.__file__):
+            with open(path, "rb") as f:
+                digest.update(f.read())
+    except OSError:
+        # 只有字节码时退回到词库内容
+        digest.update(repr(skills.SKILL_KEYWORDS).encode("utf-8"))
+    return digest.hexdigest()[:12]
+
+
+# 用于区分不同版本评分逻辑下缓存的匹配结果
+SCORER_VERSION = _scorer_version()
+
+# 学历等级（数值越大学历越高）
+EDUCATION_LEVELS = {
+    "博士": 5, "硕士": 4, "研究生": 4, "本科": 3, "学士": 3,
+    "大专": 2, "专科": 2, "高中": 1
+}
+
+
 class ResumeMatcher:
     """简历匹配器"""
     
     def __init__(self):
+        self.version = SCORER_VERSION
+        
         # 从共享配置导入技能关键词库
         self.skill_keywords = get_skill_keywords_lowercase()
         
+        # 预编译技能匹配模式（按长度从长到短，优先匹配长技能）；
+        # 关键词数量远超 re 模块的编译缓存，每次匹配时再编译会占用绝大部分匹配耗时
+        self.skill_patterns = [
+            (skill, re.compile(self._skill_pattern(skill), re.IGNORECASE))
+            for skill in sorted(self.skill_keywords, key=lambda x: len(x), reverse=True)
+        ]
+        
         # 岗位描述关键词（用于判断描述是否有效）
         self.job_keywords = [
             "岗位", "职位", "招聘", "要求", "职责", "工作", "经验", "学历", "技能",
@@ -23,34 +59,48 @@ class ResumeMatcher:
             "熟悉", "掌握", "了解", "精通", "具备", "拥有"
         ]
     
-    def match(self, resume_text, job_description, extracted_info=None):
+    def match(self, resume_text, job_description, extracted_info=None, deadline=None):
         """计算简历与岗位的匹配度"""
-        
-        # 验证岗位描述有效性
+        return self.match_job(resume_text, self.analyze_job(job_description), extracted_info, deadline)
+    
+    def analyze_job(self, job_description):
+        """分析岗位描述（有效性、技能、经验和学历要求），结果可在多份简历间复用"""
+        job_description = job_description or ""
         job_validity = self._validate_job_description(job_description)
-        if not job_validity["valid"]:
-            return {
-                "overall_score": 0,
-                "skill_match": {
-                    "score": 0,
-                    "matched_skills": [],
-                    "missing_skills": [],
-                    "extra_skills": []
-                },
-                "experience_match": {
-                    "score": 0,
-                    "analysis": job_validity["reason"]
-                },
-                "education_match": {
-                    "score": 0,
-                    "analysis": ""
-                },
-                "recommendations": [job_validity["reason"]]
-            }
+        profile = {
+            "valid": job_validity["valid"],
+            "reason": job_validity["reason"],
+            "skills": [],
+            "required_years": 0,
+            "required_education": "",
+            "required_education_level": 0,
+            "short_description": len(job_description.strip()) < 50
+        }
+        if not profile["valid"]:
+            return profile
+        
+        with stage("job_skills"):
+            profile["skills"] = self._extract_skills(job_description)
+        profile["required_years"] = self._extract_required_years(job_description)
+        profile["required_education"], profile["required_education_level"] = self._extract_required_education(job_description)
+        
+        logger.info(f"从岗位描述中提取到技能: {profile['skills']} (共{len(profile['skills'])}个)")
+        return profile
+    
+    def match_job(self, resume_text, job_profile, extracted_info=None, deadline=None):
+        """使用 analyze_job 的结果计算简历匹配度"""
         
+        # 岗位描述无效时不需要分析简历
+        if not job_profile["valid"]:
+            return self._invalid_job_result(job_profile["reason"])
+        
+        return self.score(self.analyze_resume(resume_text, extracted_info), job_profile, deadline)
+    
+    def analyze_resume(self, resume_text, extracted_info=None):
+        """分析简历（合并文本与结构化信息中的技能），结果可在多个岗位间复用"""
         # 提取技能
-        resume_skills_from_text = self._extract_skills(resume_text)
-        job_skills = self._extract_skills(job_description)
+        with stage("resume_skills"):
+            resume_skills_from_text = self._extract_skills(resume_text)
         
         # 如果 extracted_info 中有技能信息，优先使用（格式可能不同）
         resume_skills_from_info = []
@@ -64,29 +114,46 @@ class ResumeMatcher:
         all_resume_skills = list(set(resume_skills_from_text + resume_skills_from_info))
         
         # 记录提取的技能（用于调试）
-        logger.info(f"从岗位描述中提取到技能: {job_skills} (共{len(job_skills)}个)")
         logger.info(f"从简历文本中提取到技能: {resume_skills_from_text} (共{len(resume_skills_from_text)}个)")
         logger.info(f"从简历信息中提取到技能: {resume_skills_from_info} (共{len(resume_skills_from_info)}个)")
         logger.info(f"合并后的简历技能: {all_resume_skills} (共{len(all_resume_skills)}个)")
         
+        return {
+            "skills": all_resume_skills,
+            "optional_info": extracted_info.get("optional_info", {}) if extracted_info else {},
+            "has_extracted_info": bool(extracted_info)
+        }
+    
+    def score(self, resume_profile, job_profile, deadline=None):
+        """使用简历画像和岗位画像计算匹配度，不再扫描任何文本
+
+        deadline 剩余时间不足时不生成改进建议，结果中 degraded 标出被跳过的字段。
+        """
+        if not job_profile["valid"]:
+            return self._invalid_job_result(job_profile["reason"])
+        
+        job_skills = job_profile["skills"]
+        
         # 计算技能匹配
-        skill_result = self._calc_skill_match(all_resume_skills, job_skills)
+        with stage("skill_match"):
+            skill_result = self._calc_skill_match(list(resume_profile["skills"]), job_skills)
         
         # 详细记录匹配过程
         logger.info(f"技能匹配结果: 匹配={skill_result.get('matched_skills', [])}, 缺失={skill_result.get('missing_skills', [])}, 额外={skill_result.get('extra_skills', [])}")
         
         # 计算经验匹配
         exp_result = {"score": 70, "analysis": "未检测到明确经验要求"}
-        if extracted_info:
-            exp_result = self._calc_experience_match(
-                extracted_info.get("optional_info", {}),
-                job_description
+        if resume_profile["has_extracted_info"]:
+            exp_result = self._score_experience(
+                resume_profile["optional_info"],
+                job_profile["required_years"]
             )
         
         # 计算学历匹配
-        edu_result = self._calc_education_match(
-            extracted_info.get("optional_info", {}) if extracted_info else {},
-            job_description
+        edu_result = self._score_education(
+            resume_profile["optional_info"],
+            job_profile["required_education"],
+            job_profile["required_education_level"]
         )
         
         # 综合评分（移除文本相似度，权重重新分配）
@@ -97,15 +164,42 @@ class ResumeMatcher:
         )
         
         # 如果岗位描述中没有提取到任何技能，降低评分
-        if not job_skills and len(job_description.strip()) < 50:
+        if not job_skills and job_profile["short_description"]:
             overall = overall * 0.5
         
-        return {
+        result = {
             "overall_score": round(overall, 1),
             "skill_match": skill_result,
             "experience_match": exp_result,
             "education_match": edu_result,
-            "recommendations": self._generate_recommendations(skill_result, exp_result, overall, job_skills)
+            "recommendations": []
+        }
+        if allows(deadline, "recommendations"):
+            with stage("recommendations"):
+                result["recommendations"] = self._generate_recommendations(skill_result, exp_result, overall, job_skills)
+        else:
+            result["degraded"] = ["recommendations"]
+        return result
+    
+    def _invalid_job_result(self, reason):
+        """岗位描述无效时的匹配结果"""
+        return {
+            "overall_score": 0,
+            "skill_match": {
+                "score": 0,
+                "matched_skills": [],
+                "missing_skills": [],
+                "extra_skills": []
+            },
+            "experience_match": {
+                "score": 0,
+                "analysis": reason
+            },
+            "education_match": {
+                "score": 0,
+                "analysis": ""
+            },
+            "recommendations": [reason]
         }
     
     def _validate_job_description(self, job_desc):
@@ -157,44 +251,17 @@ class ResumeMatcher:
         found_positions = {}  # 记录已找到的技能位置，避免重复
         
         # 按长度从长到短排序，优先匹配长技能（如 "tcp/ip" 应该在 "tcp" 之前）
-        sorted_skills = sorted(self.skill_keywords, key=lambda x: len(x), reverse=True)
-        
-        for skill in sorted_skills:
+        for skill, pattern in self.skill_patterns:
             # 跳过已找到的技能（避免重复）
             if skill in found:
                 continue
             
-            skill_lower = skill.lower()
-            skill_escaped = re.escape(skill_lower)
-            
-            # 构建匹配模式
-            # 对于包含特殊字符的技能（如 c++, c#, tcp/ip），使用精确匹配
-            if '+' in skill or '#' in skill or '/' in skill:
-                # 特殊字符技能：在标点符号或空格前后都可以匹配
-                # 例如：匹配 "c++"、"C++"、"c++，"、" c++ " 等
-                # 注意：对于 "tcp/ip"，需要匹配 "tcp/ip" 或 "tcp ip" 或 "tcpip"
-                if '/' in skill:
-                    # 对于 tcp/ip，也匹配 tcp ip 或 tcpip
-                    parts = skill.split('/')
-                    pattern = r'(?:^|[\s、，,；;或|])' + re.escape(parts[0].lower()) + r'[\s/]*' + re.escape(parts[1].lower()) + r'(?:[\s、，,；;或|]|$)'
-                else:
-                    pattern = r'(?:^|[\s、，,；;或|])' + skill_escaped + r'(?:[\s、，,；;或|]|$)'
-            elif re.match(r'^[a-zA-Z0-9]+$', skill):
-                # 纯字母数字技能：使用单词边界或中文边界
-                # 在中文文本中，英文单词可能直接跟中文，需要特殊处理
-                # 匹配模式：单词边界 或 中文前/后 或 标点符号前后
-                # 注意：使用非捕获组，避免影响匹配结果
-                pattern = r'(?:^|(?<![a-zA-Z0-9])|[\s、，,；;或|]|[\u4e00-\u9fff])' + skill_escaped + r'(?:(?![a-zA-Z0-9])|[\s、，,；;或|]|[\u4e00-\u9fff]|$)'
-            else:
-                # 中文技能或其他：直接匹配
-                pattern = skill_escaped
-            
             # 在标准化文本中搜索（已处理标点符号）
-            matches = list(re.finditer(pattern, text_normalized, re.IGNORECASE))
+            matches = list(pattern.finditer(text_normalized))
             
             # 如果没找到，也在原始小写文本中搜索（处理一些边界情况）
             if not matches:
-                matches = list(re.finditer(pattern, text_lower, re.IGNORECASE))
+                matches = list(pattern.finditer(text_lower))
             
             # 处理匹配结果
             for match in matches:
@@ -233,6 +300,35 @@ class ResumeMatcher:
         
         return result
     
+    def _skill_pattern(self, skill):
+        """构建技能的匹配模式"""
+        skill_lower = skill.lower()
+        skill_escaped = re.escape(skill_lower)
+        
+        # 构建匹配模式
+        # 对于包含特殊字符的技能（如 c++, c#, tcp/ip），使用精确匹配
+        if '+' in skill or '#' in skill or '/' in skill:
+            # 特殊字符技能：在标点符号或空格前后都可以匹配
+            # 例如：匹配 "c++"、"C++"、"c++，"、" c++ " 等
+            # 注意：对于 "tcp/ip"，需要匹配 "tcp/ip" 或 "tcp ip" 或 "tcpip"
+            if '/' in skill:
+                # 对于 tcp/ip，也匹配 tcp ip 或 tcpip
+                parts = skill.split('/')
+                pattern = r'(?:^|[\s、，,；;或|])' + re.escape(parts[0].lower()) + r'[\s/]*' + re.escape(parts[1].lower()) + r'(?:[\s、，,；;或|]|$)'
+            else:
+                pattern = r'(?:^|[\s、，,；;或|])' + skill_escaped + r'(?:[\s、，,；;或|]|$)'
+        elif re.match(r'^[a-zA-Z0-9]+$', skill):
+            # 纯字母数字技能：使用单词边界或中文边界
+            # 在中文文本中，英文单词可能直接跟中文，需要特殊处理
+            # 匹配模式：单词边界 或 中文前/后 或 标点符号前后
+            # 注意：使用非捕获组，避免影响匹配结果
+            # 汉字没有大小写，中文字符集用 (?-i:...) 关闭忽略大小写，否则每次编译都要逐个折叠两万多个字符
+            pattern = r'(?:^|(?<![a-zA-Z0-9])|[\s、，,；;或|]|(?-i:[\u4e00-\u9fff]))' + skill_escaped + r'(?:(?![a-zA-Z0-9])|[\s、，,；;或|]|(?-i:[\u4e00-\u9fff])|$)'
+        else:
+            # 中文技能或其他：直接匹配
+            pattern = skill_escaped
+        return pattern
+    
     def _calc_skill_match(self, resume_skills, job_skills):
         """计算技能匹配度（标准化技能名称后匹配）"""
         if not job_skills:
@@ -317,18 +413,8 @@ class ResumeMatcher:
             "extra_skills": extra_original
         }
     
-    def _calc_experience_match(self, optional_info, job_desc):
-        """计算经验匹配"""
-        resume_exp = optional_info.get("experience_years", "")
-        
-        resume_years = 0
-        if resume_exp:
-            m = re.search(r"(\d+)", str(resume_exp))
-            if m:
-                resume_years = int(m.group(1))
-        
-        # 从岗位描述提取要求
-        required = 0
+    def _extract_required_years(self, job_desc):
+        """从岗位描述提取经验年限要求，未要求时返回 0"""
         patterns = [
             r"(\d+)\s*年[以上]*[工作]*经[验历]",
             r"(\d+)\+?\s*年",
@@ -337,8 +423,18 @@ class ResumeMatcher:
         for pattern in patterns:
             m = re.search(pattern, job_desc)
             if m:
-                required = int(m.group(1))
-                break
+                return int(m.group(1))
+        return 0
+    
+    def _score_experience(self, optional_info, required):
+        """根据简历经验年限和岗位要求年限评分"""
+        resume_exp = optional_info.get("experience_years", "")
+        
+        resume_years = 0
+        if resume_exp:
+            m = re.search(r"(\d+)", str(resume_exp))
+            if m:
+                resume_years = int(m.group(1))
         
         if required == 0:
             return {"score": 70, "analysis": "岗位未明确经验要求"}
@@ -351,30 +447,23 @@ class ResumeMatcher:
             score = max(30, resume_years / required * 100)
             return {"score": round(score, 1), "analysis": f"经验不足（{resume_years}年 < {required}年）"}
     
-    def _calc_education_match(self, optional_info, job_desc):
-        """计算学历匹配"""
+    def _extract_required_education(self, job_desc):
+        """从岗位描述提取学历要求，返回 (学历名称, 等级)，未要求时返回 ("", 0)"""
+        for edu, level in EDUCATION_LEVELS.items():
+            if edu in job_desc:
+                return edu, level
+        return "", 0
+    
+    def _score_education(self, optional_info, required_edu, required_level):
+        """根据简历学历和岗位学历要求评分"""
         resume_edu = optional_info.get("education", "")
         
-        edu_levels = {
-            "博士": 5, "硕士": 4, "研究生": 4, "本科": 3, "学士": 3,
-            "大专": 2, "专科": 2, "高中": 1
-        }
-        
         resume_level = 0
-        for edu, level in edu_levels.items():
+        for edu, level in EDUCATION_LEVELS.items():
             if edu in str(resume_edu):
                 resume_level = level
                 break
         
-        # 从岗位描述提取要求
-        required_level = 0
-        required_edu = ""
-        for edu, level in edu_levels.items():
-            if edu in job_desc:
-                required_level = level
-                required_edu = edu
-                break
-        
         if required_level == 0:
             return {"score": 70, "analysis": "岗位未明确学历要求"}
         
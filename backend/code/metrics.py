@@ -0,0 +1,227 @@
+# -*- coding: utf-8 -*-
+"""
+运行指标模块 - 计数器、仪表和直方图注册表，以 Prometheus 文本格式输出（GET /metrics）
+
+每个指标各自持有一把锁，并发调用下计数准确；缓存、压缩等已有统计的模块通过 collector
+在输出时读取快照，不重复计数。指标只在当前进程内累计，多进程部署时按进程分别采集。
+"""
+import math
+import threading
+
+# 请求 / 阶段耗时的桶边界（秒）
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+PAGE_BUCKETS = (1, 2, 3, 5, 10, 20, 50)
+SKILL_BUCKETS = (0, 5, 10, 20, 30, 50, 100)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels) + "}"
+
+
+def _format_value(value):
+    if value == math.inf:
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    """带标签的指标，按标签值分别保存（线程安全）"""
+
+    type = "untyped"
+
+    def __init__(self, name, help, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"指标 {self.name} 的标签应为 {self.labelnames}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def samples(self):
+        """返回 [(后缀, 标签列表, 值), ...]"""
+        with self._lock:
+            items = list(self._values.items())
+        return [("", list(zip(self.labelnames, key)), value) for key, value in items]
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    type = "gauge"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(self, name, help, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            counts = entry[0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            entry[1] += value
+            entry[2] += 1
+
+    def samples(self):
+        with self._lock:
+            items = [(key, (list(counts), total, count)) for key, (counts, total, count) in self._values.items()]
+        result = []
+        for key, (counts, total, count) in items:
+            labels = list(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, n in zip(self.buckets, counts):
+                cumulative += n
+                result.append(("_bucket", labels + [("le", _format_value(float(bound)))], cumulative))
+            result.append(("_sum", labels, total))
+            result.append(("_count", labels, count))
+        return result
+
+
+class Registry:
+    """指标注册表；collector 是返回 [(名称, 类型, 说明, [(标签字典, 值), ...]), ...] 的函数"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics = {}
+        self._collectors = []
+
+    def _register(self, metric):
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name, help, labelnames=()):
+        return self._register(Counter(name, help, labelnames))
+
+    def gauge(self, name, help, labelnames=()):
+        return self._register(Gauge(name, help, labelnames))
+
+    def histogram(self, name, help, labelnames=(), buckets=LATENCY_BUCKETS):
+        return self._register(Histogram(name, help, labelnames, buckets))
+
+    def register_collector(self, collector):
+        with self._lock:
+            self._collectors.append(collector)
+
+    def render(self):
+        """Prometheus 文本格式（version 0.0.4）"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+            collectors = list(self._collectors)
+
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            for suffix, labels, value in metric.samples():
+                lines.append(f"{metric.name}{suffix}{_format_labels(labels)} {_format_value(value)}")
+
+        families = {}
+        for collector in collectors:
+            for name, type_, help, samples in collector():
+                family = families.setdefault(name, (type_, help, []))
+                family[2].extend(samples)
+        for name, (type_, help, samples) in families.items():
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} {type_}")
+            for labels, value in samples:
+                lines.append(f"{name}{_format_labels(sorted(labels.items()))} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+# 请求指标（index.handle_event 记录）
+requests_total = registry.counter("cv_requests_total", "处理的请求数", ("route", "method", "status"))
+request_duration = registry.histogram(
+    "cv_request_duration_seconds", "请求处理耗时（流式响应不含逐行写出的时间）", ("route",)
+)
+requests_in_flight = registry.gauge("cv_requests_in_flight", "正在处理的请求数")
+stage_duration = registry.histogram(
+    "cv_stage_duration_seconds", "各处理阶段耗时（来自阶段计时，TIMING_ENABLED=0 时不记录）", ("stage",)
+)
+
+# 解析结果指标（只统计新解析的简历，不含缓存命中）
+resumes_parsed = registry.counter("cv_resumes_parsed_total", "新解析的简历数")
+pdf_pages = registry.histogram("cv_pdf_pages", "简历 PDF 页数", buckets=PAGE_BUCKETS)
+resume_skills = registry.histogram("cv_resume_skills", "从简历中提取到的技能数", buckets=SKILL_BUCKETS)
+
+
+def observe_stages(timings):
+    """把一次请求的阶段耗时记入 cv_stage_duration_seconds"""
+    if timings is None:
+        return
+    for name, seconds in list(timings.stages.items()):
+        stage_duration.observe(seconds, stage=name)
+
+
+def observe_resume(result):
+    """记录一份新解析简历的页数和技能数"""
+    resumes_parsed.inc()
+    if result.get("page_count") is not None:
+        pdf_pages.observe(result["page_count"])
+    skills = (result.get("extracted_info") or {}).get("skills")
+    if skills is not None:
+        resume_skills.observe(len(skills))
+
+
+def stats_collector(prefix, sources, fields):
+    """把 stats() 快照转换为指标
+
+    sources 返回 [(标签字典, 快照字典), ...]；fields 为 [(快照键, 指标名后缀, 类型, 说明), ...]，
+    快照中没有的键跳过。
+    """
+    def collect():
+        families = []
+        snapshots = list(sources())
+        for key, suffix, type_, help in fields:
+            samples = [(labels, stats[key]) for labels, stats in snapshots
+                       if isinstance(stats.get(key), (int, float)) and not isinstance(stats.get(key), bool)]
+            if samples:
+                families.append((f"{prefix}_{suffix}", type_, help, samples))
+        return families
+    return collect
@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+"""
+multipart/form-data 解析模块 - 基于偏移量扫描边界，文件内容以 memoryview 返回，不复制请求体
+"""
+from urllib.parse import unquote
+
+
+class Part:
+    """multipart 中的一个字段"""
+    __slots__ = ("headers", "name", "filename", "content_type", "data")
+
+    def __init__(self, headers, data):
+        self.headers = headers
+        self.data = data
+        _, params = parse_header_value(headers.get("content-disposition", ""))
+        self.name = params.get("name")
+        self.filename = params.get("filename")
+        self.content_type = headers.get("content-type", "text/plain")
+
+    @property
+    def is_file(self):
+        return self.filename is not None
+
+    def __len__(self):
+        return len(self.data)
+
+
+def parse_header_value(value):
+    """解析形如 `form-data; name="file"; filename="简历.pdf"` 的头部值，返回 (主值, 参数字典)"""
+    params = {}
+    n = len(value)
+
+    # 主值
+    end = value.find(";")
+    if end == -1:
+        return value.strip().lower(), params
+    main = value[:end].strip().lower()
+    i = end + 1
+
+    while i < n:
+        # 参数名
+        eq = value.find("=", i)
+        if eq == -1:
+            break
+        key = value[i:eq].strip().lower()
+        i = eq + 1
+        while i < n and value[i] == " ":
+            i += 1
+        # 参数值：带引号时支持转义和引号内的分号
+        if i < n and value[i] == '"':
+            i += 1
+            chars = []
+            while i < n and value[i] != '"':
+                if value[i] == "\\" and i + 1 < n:
+                    i += 1
+                chars.append(value[i])
+                i += 1
+            val = "".join(chars)
+            i += 1
+            semi = value.find(";", i)
+            i = n if semi == -1 else semi + 1
+        else:
+            semi = value.find(";", i)
+            if semi == -1:
+                val, i = value[i:].strip(), n
+            else:
+                val, i = value[i:semi].strip(), semi + 1
+        params[key] = val
+
+    # RFC 5987: filename*=UTF-8''%E7%AE%80%E5%8E%86.pdf
+    for key in [k for k in params if k.endswith("*")]:
+        charset, _, encoded = params.pop(key).partition("''")
+        try:
+            params[key[:-1]] = unquote(encoded, encoding=charset or "utf-8")
+        except LookupError:
+            params[key[:-1]] = unquote(encoded)
+    return main, params
+
+
+def get_boundary(content_type):
+    """从 Content-Type 中获取 boundary"""
+    mime, params = parse_header_value(content_type or "")
+    if mime != "multipart/form-data":
+        return None
+    return params.get("boundary") or None
+
+
+def _parse_part_headers(raw):
+    """解析字段头部，头部名统一转为小写"""
+    headers = {}
+    for line in bytes(raw).split(b"\r\n"):
+        name, sep, value = line.partition(b":")
+        if sep:
+            headers[name.strip().decode("latin-1").lower()] = value.strip().decode("utf-8", "replace")
+    return headers
+
+
+def iter_parts(body, boundary):
+    """依次产出 multipart 字段；字段内容是原始请求体上的 memoryview 切片"""
+    if isinstance(body, str):
+        body = body.encode("utf-8")
+    view = memoryview(body)
+    delimiter = b"--" + boundary.encode("latin-1")
+    separator = b"\r\n" + delimiter
+
+    pos = body.find(delimiter)
+    if pos == -1:
+        return
+    pos += len(delimiter)
+
+    while pos < len(body):
+        # 结束标记 "--boundary--"
+        if body[pos:pos + 2] == b"--":
+            return
+        # 跳过边界行剩余部分（可能有空白填充）
+        line_end = body.find(b"\r\n", pos)
+        if line_end == -1:
+            return
+        header_start = line_end + 2
+        if body.startswith(b"\r\n", header_start):
+            # 没有头部的字段
+            header_end = header_start - 2
+        else:
+            header_end = body.find(b"\r\n\r\n", header_start)
+            if header_end == -1:
+                return
+        data_start = header_end + 4
+
+        next_pos = body.find(separator, data_start)
+        if next_pos == -1:
+            # 请求体被截断，宽松处理：取到末尾
+            data_end = len(body)
+            if body.endswith(b"\r\n"):
+                data_end -= 2
+            yield Part(_parse_part_headers(view[header_start:header_end]), view[data_start:data_end])
+            return
+
+        yield Part(_parse_part_headers(view[header_start:header_end]), view[data_start:next_pos])
+        pos = next_pos + len(separator)
+
+
+def parse_form(body, content_type):
+    """解析全部字段，返回 Part 列表"""
+    boundary = get_boundary(content_type)
+    if not boundary:
+        return []
+    return list(iter_parts(body, boundary))
+
+
+def find_file_part(body, content_type):
+    """返回第一个文件字段，没有时返回 None"""
+    boundary = get_boundary(content_type)
+    if not boundary:
+        return None
+    for part in iter_parts(body, boundary):
+        if part.is_file:
+            return part
+    return None
@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+"""
+简历处理流水线 - PDF 解析 + 关键信息提取，供 API 入口和批量处理进程共用
+"""
+import logging
+
+from deadline import degraded_count, degraded_since
+
+logger = logging.getLogger(__name__)
+
+# 可以按需跳过计算的字段（cache_key、raw_text、extracted_info 是匹配所需的核心字段，总是计算）
+OPTIONAL_FIELDS = ("pages", "structured_text")
+
+
+def run_pipeline(resume_parser, info_extractor, pdf_data, cache_key, skip=(), deadline=None):
+    """解析 PDF 并提取关键信息，返回 (结果, 错误信息)
+
+    skip 中的可选字段不计算；deadline 剩余时间不足时跳过的字段记录在结果的 degraded 中。
+    """
+    start = degraded_count(deadline)
+    
+    # 解析 PDF
+    logger.info("开始解析 PDF...")
+    parsed_result = resume_parser.parse(
+        pdf_data,
+        include_pages="pages" not in skip,
+        include_structure="structured_text" not in skip,
+        deadline=deadline
+    )
+    
+    if not parsed_result["success"]:
+        return None, parsed_result["error"]
+    
+    # 提取关键信息
+    logger.info("开始提取关键信息...")
+    extracted_info = info_extractor.extract(parsed_result["text"], deadline)
+    
+    result = {
+        "cache_key": cache_key,
+        "raw_text": parsed_result["text"],
+        "page_count": parsed_result["page_count"],
+        "extracted_info": extracted_info
+    }
+    for field in OPTIONAL_FIELDS:
+        if field in parsed_result:
+            result[field] = parsed_result[field]
+    degraded = degraded_since(deadline, start)
+    if degraded:
+        result["degraded"] = degraded
+    return result, None
+
+
+def missing_fields(result, skip=()):
+    """缓存结果中缺少、但本次请求需要的字段（包括之前因时间预算不足而降级的关键信息）"""
+    missing = [field for field in OPTIONAL_FIELDS if field not in skip and field not in result]
+    if any(step.startswith("extracted_info.") for step in result.get("degraded", ())):
+        missing.append("extracted_info")
+    return missing
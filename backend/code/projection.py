@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+"""
+响应字段投影模块 - 按 fields / exclude 参数裁剪返回数据，支持 `a.b` 形式的嵌套路径
+"""
+
+
+class Projection:
+    """字段投影：fields 为保留的字段，exclude 为去掉的字段，两者都为空时返回完整数据"""
+
+    def __init__(self, fields=None, exclude=None):
+        self.fields = _parse_paths(fields)
+        self.exclude = _parse_paths(exclude)
+
+    @classmethod
+    def from_params(cls, *sources):
+        """从查询参数 / JSON 请求体中读取 fields 和 exclude，靠前的来源优先"""
+        fields = exclude = None
+        for source in sources:
+            if not isinstance(source, dict):
+                continue
+            fields = fields if fields is not None else source.get("fields")
+            exclude = exclude if exclude is not None else source.get("exclude")
+        return cls(fields, exclude)
+
+    @property
+    def is_identity(self):
+        return not self.fields and not self.exclude
+
+    def wants(self, field):
+        """顶层字段是否需要返回（用于决定是否计算该字段）"""
+        if self.fields and not any(path[0] == field for path in self.fields):
+            return False
+        if any(path == (field,) for path in self.exclude):
+            return False
+        return True
+
+    def apply(self, data):
+        """返回裁剪后的新对象，不修改原数据"""
+        if self.is_identity or not isinstance(data, dict):
+            return data
+        result = _select(data, self.fields) if self.fields else data
+        if self.exclude:
+            result = _drop(result, self.exclude)
+        return result
+
+    def cache_token(self):
+        """投影的规范化表示，用于区分不同投影下的缓存响应体"""
+        if self.is_identity:
+            return ""
+        fields = ",".join(sorted(".".join(p) for p in self.fields))
+        exclude = ",".join(sorted(".".join(p) for p in self.exclude))
+        return f"f={fields};x={exclude}"
+
+
+def _parse_paths(value):
+    """解析 "a,b.c" 或 ["a", "b.c"] 为路径元组列表"""
+    if not value:
+        return []
+    if isinstance(value, str):
+        value = value.split(",")
+    paths = []
+    for item in value:
+        item = str(item).strip()
+        if item:
+            paths.append(tuple(part for part in item.split(".") if part))
+    return [p for p in paths if p]
+
+
+def _select(data, paths):
+    """只保留指定路径"""
+    result = {}
+    children = {}
+    for path in paths:
+        head = path[0]
+        if head not in data:
+            continue
+        if len(path) == 1:
+            result[head] = data[head]
+            children.pop(head, None)
+        elif head not in result:
+            children.setdefault(head, []).append(path[1:])
+    for head, sub_paths in children.items():
+        value = data[head]
+        result[head] = _select(value, sub_paths) if isinstance(value, dict) else value
+    return result
+
+
+def _drop(data, paths):
+    """去掉指定路径，只复制被修改的层级"""
+    result = dict(data)
+    children = {}
+    for path in paths:
+        if len(path) == 1:
+            result.pop(path[0], None)
+        else:
+            children.setdefault(path[0], []).append(path[1:])
+    for head, sub_paths in children.items():
+        if isinstance(result.get(head), dict):
+            result[head] = _drop(result[head], sub_paths)
+    return result
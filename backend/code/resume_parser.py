@@ -2,10 +2,14 @@
 """
 简历 PDF 解析模块 - 使用 PyMuPDF (fitz)
 """
+import os
 import re
 import logging
 import fitz  # PyMuPDF
 
+from deadline import allows
+from timing import stage
+
 logger = logging.getLogger(__name__)
 
 
@@ -25,28 +29,46 @@ class ResumeParser:
             "证书", "资格证书",
         ]
     
-    def parse(self, pdf_data):
-        """解析 PDF 文件"""
+    def parse(self, pdf_data, include_pages=True, include_structure=True, deadline=None):
+        """解析 PDF 文件（pdf_data 可以是字节内容或文件路径）
+
+        include_pages / include_structure 为 False 时不生成分页文本 / 结构化段落，节省内存和 CPU；
+        deadline 剩余时间不足时也跳过结构化段落。
+        """
         try:
             # 使用 PyMuPDF 解析
-            doc = fitz.open(stream=pdf_data, filetype="pdf")
+            if isinstance(pdf_data, (str, os.PathLike)):
+                # 分片上传落盘的文件直接按路径打开，不在内存中再保留一份
+                with stage("pdf_open"):
+                    doc = fitz.open(os.fspath(pdf_data), filetype="pdf")
+            else:
+                # PyMuPDF 只接受 bytes，multipart 解析得到的 memoryview 在这里做唯一一次复制
+                if isinstance(pdf_data, memoryview):
+                    pdf_data = pdf_data.tobytes()
+                with stage("pdf_open"):
+                    doc = fitz.open(stream=pdf_data, filetype="pdf")
             
             pages_text = []
             full_text = ""
+            page_count = 0
             
             for page_num, page in enumerate(doc):
                 # 提取文本，保持布局
-                text = page.get_text("text")
-                pages_text.append({
-                    "page_number": page_num + 1,
-                    "text": text
-                })
+                with stage("get_text"):
+                    text = page.get_text("text")
+                if include_pages:
+                    pages_text.append({
+                        "page_number": page_num + 1,
+                        "text": text
+                    })
                 full_text += text + "\n"
+                page_count += 1
             
             doc.close()
             
             # 清洗文本
-            cleaned = self._clean_text(full_text)
+            with stage("clean_text"):
+                cleaned = self._clean_text(full_text)
             
             if len(cleaned) < 20:
                 return {
@@ -54,16 +76,18 @@ class ResumeParser:
                     "error": "PDF 文本内容太少，可能是扫描版或图片版简历"
                 }
             
-            # 结构化处理
-            structured = self._structure_text(cleaned)
-            
-            return {
+            result = {
                 "success": True,
                 "text": cleaned,
-                "pages": pages_text,
-                "page_count": len(pages_text),
-                "structured_text": structured
+                "page_count": page_count
             }
+            if include_pages:
+                result["pages"] = pages_text
+            if include_structure and allows(deadline, "structured_text"):
+                # 结构化处理
+                with stage("structure_text"):
+                    result["structured_text"] = self._structure_text(cleaned)
+            return result
             
         except Exception as e:
             logger.error(f"PDF 解析错误: {e}")
@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+"""
+JSON 序列化模块 - 安装了 orjson 时使用 orjson，否则使用标准库 json
+
+输出统一为 UTF-8，不转义中文。JSON_ENCODER 环境变量可强制指定实现（auto / orjson / json）。
+"""
+import os
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+JSON_ENCODER = os.environ.get("JSON_ENCODER", "auto").lower()
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if JSON_ENCODER == "json":
+    orjson = None
+elif JSON_ENCODER == "orjson" and orjson is None:
+    logger.warning("JSON_ENCODER=orjson 但未安装 orjson，使用标准库 json")
+
+BACKEND = "orjson" if orjson is not None else "json"
+
+# orjson 默认不支持非字符串键，开启后与标准库行为一致
+_ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS if orjson is not None else 0
+
+
+def _stdlib_dumps_bytes(obj):
+    return json.dumps(obj, ensure_ascii=False).encode("utf-8")
+
+
+def dumps_bytes(obj):
+    """序列化为 UTF-8 字节"""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, option=_ORJSON_OPTIONS)
+        except TypeError:
+            # orjson 不支持的类型（如 set、超过 64 位的整数）交给标准库处理
+            pass
+    return _stdlib_dumps_bytes(obj)
+
+
+def dumps(obj):
+    """序列化为字符串"""
+    if orjson is not None:
+        return dumps_bytes(obj).decode("utf-8")
+    return json.dumps(obj, ensure_ascii=False)
+
+
+def loads(data):
+    """反序列化 str / bytes / bytearray / memoryview"""
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            # 标准库能接受 NaN、Infinity 等非标准写法，保持兼容
+            pass
+    if isinstance(data, memoryview):
+        data = data.tobytes()
+    return json.loads(data)
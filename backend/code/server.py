@@ -0,0 +1,239 @@
+# -*- coding: utf-8 -*-
+"""
+本地 HTTP 服务 - 将 HTTP 请求转换为函数计算事件交给 index 处理，用于本地压测和私有化部署
+
+用法：
+    cd backend/code && python server.py --port 9000 --threads 16 --processes 4
+
+每个进程使用固定大小的线程池处理连接，支持 HTTP/1.1 keep-alive；--processes 大于 1 时
+先监听端口再 fork 子进程（仅 Linux / macOS），各子进程共享同一个监听套接字。
+"""
+import os
+import sys
+import base64
+import signal
+import logging
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import HTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HOST = os.environ.get("SERVER_HOST", "127.0.0.1")
+DEFAULT_PORT = int(os.environ.get("SERVER_PORT", "9000"))
+DEFAULT_THREADS = int(os.environ.get("SERVER_THREADS", "8"))
+DEFAULT_PROCESSES = int(os.environ.get("SERVER_PROCESSES", "1"))
+DEFAULT_KEEPALIVE = float(os.environ.get("SERVER_KEEPALIVE_TIMEOUT", "5"))
+MAX_BODY_SIZE = int(os.environ.get("SERVER_MAX_BODY_SIZE", str(32 * 1024 * 1024)))
+
+# 在子进程中加载，避免 fork 前创建的连接和线程被多个进程共享
+_index = None
+
+
+def build_event(method, target, headers, body, client_ip=None):
+    """将 HTTP 请求转换为函数计算 HTTP 触发器的事件格式"""
+    url = urlsplit(target)
+    return {
+        "version": "v1",
+        "rawPath": url.path or "/",
+        "rawQueryString": url.query,
+        "headers": headers,
+        "body": base64.b64encode(body).decode("ascii"),
+        "isBase64Encoded": True,
+        "requestContext": {
+            "http": {
+                "method": method,
+                "path": url.path or "/",
+                "sourceIp": client_ip,
+            }
+        },
+    }
+
+
+class RequestHandler(BaseHTTPRequestHandler):
+    """把每个请求交给 index.handle_event，NDJSON 响应以分块编码逐行写出"""
+
+    protocol_version = "HTTP/1.1"
+    server_version = "CVAnalysis"
+    timeout = DEFAULT_KEEPALIVE
+    # 响应头和响应体分两次写出，keep-alive 时 Nagle 算法会与延迟确认叠加出约 40ms 延迟
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        self._dispatch()
+
+    do_POST = do_PUT = do_DELETE = do_OPTIONS = do_HEAD = do_PATCH = do_GET
+
+    def _read_body(self):
+        if "chunked" in self.headers.get("Transfer-Encoding", "").lower():
+            chunks = []
+            total = 0
+            while True:
+                size = int(self.rfile.readline().split(b";")[0].strip() or b"0", 16)
+                if size == 0:
+                    # 跳过 trailer
+                    while self.rfile.readline() not in (b"\r\n", b"\n", b""):
+                        pass
+                    return b"".join(chunks)
+                total += size
+                if total > MAX_BODY_SIZE:
+                    raise ValueError("请求体过大")
+                chunks.append(self.rfile.read(size))
+                self.rfile.readline()
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_BODY_SIZE:
+            raise ValueError("请求体过大")
+        return self.rfile.read(length) if length else b""
+
+    def _dispatch(self):
+        try:
+            body = self._read_body()
+        except ValueError as e:
+            self.send_error(413, str(e))
+            self.close_connection = True
+            return
+
+        headers = {name: value for name, value in self.headers.items()}
+        event = build_event(self.command, self.path, headers, body, self.client_address[0])
+        response = _index.handle_event(event, stream=True)
+        self._write_response(response)
+
+    def _write_response(self, response):
+        status = response.get("statusCode", 200)
+        body = response.get("body")
+        self.send_response(status)
+        for name, value in (response.get("headers") or {}).items():
+            if name.lower() not in ("content-length", "transfer-encoding", "connection"):
+                self.send_header(name, value)
+
+        if body is not None and not isinstance(body, (str, bytes)):
+            # 流式响应：每行一个分块，写完立即发送
+            self.send_header("Transfer-Encoding", "chunked")
+            try:
+                self.end_headers()
+                for chunk in body:
+                    if chunk:
+                        self.wfile.write(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+                        self.wfile.flush()
+                self.wfile.write(b"0\r\n\r\n")
+            except (BrokenPipeError, ConnectionResetError):
+                self.close_connection = True
+            finally:
+                close = getattr(body, "close", None)
+                if close:
+                    close()
+            return
+
+        if body is None:
+            data = b""
+        elif response.get("isBase64Encoded"):
+            data = base64.b64decode(body)
+        else:
+            data = body.encode("utf-8") if isinstance(body, str) else body
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+
+class PooledHTTPServer(HTTPServer):
+    """使用固定大小线程池处理连接的 HTTP 服务"""
+
+    def __init__(self, server_address, handler_class, threads, bind_and_activate=True):
+        super().__init__(server_address, handler_class, bind_and_activate)
+        self.executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="http")
+
+    def process_request(self, request, client_address):
+        self.executor.submit(self._process, request, client_address)
+
+    def _process(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _serve(server):
+    """在当前进程中加载服务并处理请求，直到收到 SIGTERM / SIGINT"""
+    global _index
+    import index
+    _index = index
+    # 在开始接受请求前预热组件（WARMUP_ENABLED=0 时跳过）
+    index.initializer(None)
+
+    def stop(signum, frame):
+        threading.Thread(target=server.shutdown, daemon=True).start()
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    logger.info(f"进程 {os.getpid()} 开始处理请求")
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+
+
+def run(host=DEFAULT_HOST, port=DEFAULT_PORT, threads=DEFAULT_THREADS, processes=DEFAULT_PROCESSES,
+        keepalive=DEFAULT_KEEPALIVE):
+    """启动服务；processes 大于 1 时 fork 多个子进程共享监听端口"""
+    RequestHandler.timeout = keepalive
+    server = PooledHTTPServer((host, port), RequestHandler, threads)
+    logger.info(f"监听 http://{host}:{server.server_port}（{processes} 进程 × {threads} 线程）")
+
+    if processes <= 1 or not hasattr(os, "fork"):
+        _serve(server)
+        return
+
+    children = []
+    for _ in range(processes):
+        pid = os.fork()
+        if pid == 0:
+            try:
+                _serve(server)
+            finally:
+                os._exit(0)
+        children.append(pid)
+
+    def stop(signum, frame):
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    for pid in children:
+        try:
+            os.waitpid(pid, 0)
+        except ChildProcessError:
+            pass
+    server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="简历分析 API 本地 HTTP 服务")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--threads", type=int, default=DEFAULT_THREADS, help="每个进程的线程数")
+    parser.add_argument("--processes", type=int, default=DEFAULT_PROCESSES, help="进程数")
+    parser.add_argument("--keepalive", type=float, default=DEFAULT_KEEPALIVE, help="keep-alive 空闲超时（秒）")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    run(args.host, args.port, args.threads, args.processes, args.keepalive)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+"""
+请求合并模块 - 相同 key 的并发调用只执行一次，其余调用等待并共享结果
+"""
+import threading
+
+
+class _Call:
+    """一次进行中的调用"""
+    __slots__ = ("done", "result", "error", "waiters")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """按 key 合并并发调用（同一实例内的线程之间）"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, fn):
+        """执行 fn 并返回 (结果, 是否为共享结果)；fn 抛出的异常会传递给所有等待者"""
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                leader = False
+            else:
+                call = _Call()
+                self._calls[key] = call
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, False
+
+    def in_flight(self):
+        """当前进行中的调用数"""
+        with self._lock:
+            return len(self._calls)
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+"""
+阶段计时模块 - 记录一次请求中各处理阶段的耗时，通过 Server-Timing 头和可选的 timings 字段返回
+
+计时对象保存在 contextvars 中，解析、提取、匹配各模块直接调用 stage() 而不需要层层传参；
+当前请求没有开启计时（或 TIMING_ENABLED=0）时 stage() 返回共享的空上下文管理器，只多一次变量读取。
+在线程池 / 进程池中执行的批量任务不继承计时对象，不记录阶段耗时。
+"""
+import os
+import time
+import contextvars
+from contextlib import nullcontext
+
+TIMING_ENABLED = os.environ.get("TIMING_ENABLED", "1").lower() not in ("0", "false", "no")
+
+_current = contextvars.ContextVar("timings", default=None)
+_NOOP = nullcontext()
+
+
+class Timings:
+    """一次请求的阶段耗时（秒），同名阶段多次执行时累加"""
+
+    def __init__(self, include_body=False):
+        self.include_body = include_body
+        self.started_at = time.perf_counter()
+        self.stages = {}
+
+    def add(self, name, seconds):
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def total(self):
+        return time.perf_counter() - self.started_at
+
+    def as_dict(self):
+        """各阶段耗时（毫秒），用于响应体中的 timings 字段"""
+        result = {name: round(seconds * 1000, 2) for name, seconds in self.stages.items()}
+        result["total"] = round(self.total() * 1000, 2)
+        return result
+
+    def header(self):
+        """Server-Timing 头的值，例如 pdf_open;dur=3.1, get_text;dur=20.4, total;dur=41.0"""
+        parts = [f"{name};dur={seconds * 1000:.2f}" for name, seconds in self.stages.items()]
+        parts.append(f"total;dur={self.total() * 1000:.2f}")
+        return ", ".join(parts)
+
+
+class _Stage:
+    __slots__ = ("timings", "name", "started_at")
+
+    def __init__(self, timings, name):
+        self.timings = timings
+        self.name = name
+
+    def __enter__(self):
+        self.started_at = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.timings.add(self.name, time.perf_counter() - self.started_at)
+        return False
+
+
+def stage(name):
+    """记录 with 块的耗时；当前请求未开启计时时不做任何事"""
+    timings = _current.get()
+    if timings is None:
+        return _NOOP
+    return _Stage(timings, name)
+
+
+def current():
+    """当前请求的计时对象，未开启计时时为 None"""
+    return _current.get()
+
+
+def begin(include_body=False):
+    """为当前请求开启计时，返回 (计时对象, 令牌)；TIMING_ENABLED=0 时返回 (None, None)"""
+    if not TIMING_ENABLED:
+        return None, None
+    timings = Timings(include_body)
+    return timings, _current.set(timings)
+
+
+def end(token):
+    """结束当前请求的计时"""
+    if token is not None:
+        _current.reset(token)
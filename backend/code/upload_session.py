@@ -0,0 +1,249 @@
+# -*- coding: utf-8 -*-
+"""
+分片上传会话模块 - 分片写入本地临时文件，边接收边计算摘要，支持断点续传
+
+会话元数据同时写入会话目录中的 JSON 文件。UPLOAD_SESSION_DIR 指向 NAS 等共享目录时，
+其他实例可以从磁盘恢复会话并重建摘要状态。
+"""
+import os
+import json
+import time
+import uuid
+import shutil
+import hashlib
+import logging
+import tempfile
+import threading
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SESSION_DIR = os.path.join(tempfile.gettempdir(), "cv_upload_sessions")
+DEFAULT_MAX_SIZE = int(os.environ.get("UPLOAD_MAX_SIZE", str(20 * 1024 * 1024)))
+DEFAULT_CHUNK_SIZE = int(os.environ.get("UPLOAD_CHUNK_SIZE", str(2 * 1024 * 1024)))
+DEFAULT_SESSION_TTL = float(os.environ.get("UPLOAD_SESSION_TTL", "3600"))
+
+_READ_BLOCK = 1024 * 1024
+_HEX_DIGITS = frozenset("0123456789abcdef")
+
+
+def valid_session_id(session_id):
+    """会话 ID 必须是 uuid4().hex 格式（32 位小写十六进制），防止拼接路径时越出会话目录"""
+    return isinstance(session_id, str) and len(session_id) == 32 and _HEX_DIGITS.issuperset(session_id)
+
+
+class UploadSessionError(Exception):
+    """上传会话错误，携带对应的 HTTP 状态码"""
+
+    def __init__(self, status_code, message):
+        super().__init__(message)
+        self.status_code = status_code
+        self.message = message
+
+
+class UploadSession:
+    """一次分片上传"""
+
+    def __init__(self, session_id, directory, filename=None, total_size=None, created_at=None):
+        self.id = session_id
+        self.directory = directory
+        self.filename = filename
+        self.total_size = total_size
+        self.created_at = created_at or time.time()
+        self.updated_at = self.created_at
+        self.received = 0
+        self.chunks = 0
+        self.completed = False
+        self.hasher = hashlib.md5()
+        self.lock = threading.Lock()
+
+    @property
+    def data_path(self):
+        return os.path.join(self.directory, "data.pdf")
+
+    @property
+    def meta_path(self):
+        return os.path.join(self.directory, "meta.json")
+
+    def to_dict(self):
+        return {
+            "session_id": self.id,
+            "filename": self.filename,
+            "total_size": self.total_size,
+            "received": self.received,
+            "chunks": self.chunks,
+            "completed": self.completed,
+        }
+
+    def save_meta(self):
+        meta = self.to_dict()
+        meta["created_at"] = self.created_at
+        tmp_path = self.meta_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False)
+        os.replace(tmp_path, self.meta_path)
+
+
+class UploadSessionManager:
+    """管理分片上传会话"""
+
+    def __init__(self, root=None, max_size=None, chunk_size=None, ttl=None):
+        self.root = root or os.environ.get("UPLOAD_SESSION_DIR", DEFAULT_SESSION_DIR)
+        self.max_size = max_size or DEFAULT_MAX_SIZE
+        self.chunk_size = chunk_size or DEFAULT_CHUNK_SIZE
+        self.ttl = ttl or DEFAULT_SESSION_TTL
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def create(self, filename=None, total_size=None):
+        """创建会话"""
+        if total_size is not None:
+            try:
+                total_size = int(total_size)
+            except (TypeError, ValueError):
+                raise UploadSessionError(400, "文件大小无效")
+            if total_size <= 0:
+                raise UploadSessionError(400, "文件大小无效")
+            if total_size > self.max_size:
+                raise UploadSessionError(413, f"文件过大，最大支持 {self.max_size // (1024 * 1024)} MB")
+
+        self.cleanup_expired()
+        session_id = uuid.uuid4().hex
+        directory = os.path.join(self.root, session_id)
+        os.makedirs(directory, exist_ok=True)
+        session = UploadSession(session_id, directory, filename, total_size)
+        open(session.data_path, "wb").close()
+        session.save_meta()
+        with self._lock:
+            self._sessions[session_id] = session
+        logger.info(f"创建上传会话: {session_id} ({filename}, {total_size} 字节)")
+        return session
+
+    def get(self, session_id):
+        """获取会话；本实例没有时尝试从共享目录恢复"""
+        with self._lock:
+            session = self._sessions.get(session_id)
+        if session is None:
+            session = self._restore(session_id)
+        if session is None:
+            raise UploadSessionError(404, "上传会话不存在或已过期")
+        return session
+
+    def append(self, session_id, offset, data):
+        """在指定偏移量写入分片；重复发送已接收的分片是幂等的"""
+        session = self.get(session_id)
+        with session.lock:
+            if session.completed:
+                raise UploadSessionError(409, "上传会话已完成")
+            end = offset + len(data)
+            if offset < session.received and end <= session.received:
+                # 客户端重试了已经写入的分片
+                return session
+            if offset != session.received:
+                raise UploadSessionError(409, f"分片偏移量不连续，期望 {session.received}")
+            if not data:
+                raise UploadSessionError(400, "分片内容为空")
+            if end > self.max_size or (session.total_size and end > session.total_size):
+                raise UploadSessionError(413, "上传内容超过声明的文件大小")
+
+            with open(session.data_path, "ab") as f:
+                f.write(data)
+            session.hasher.update(data)
+            session.received = end
+            session.chunks += 1
+            session.updated_at = time.time()
+            session.save_meta()
+        return session
+
+    def complete(self, session_id, expected_md5=None):
+        """结束上传，返回 (会话, 文件路径, MD5 摘要)；文件在 discard 时删除"""
+        session = self.get(session_id)
+        with session.lock:
+            if session.received == 0:
+                raise UploadSessionError(400, "未接收到任何分片")
+            if session.total_size and session.received != session.total_size:
+                raise UploadSessionError(409, f"上传未完成（{session.received}/{session.total_size} 字节）")
+            digest = session.hasher.hexdigest()
+            if expected_md5 and expected_md5.lower() != digest:
+                raise UploadSessionError(422, "文件校验失败，MD5 不一致")
+            session.completed = True
+            session.save_meta()
+        return session, session.data_path, digest
+
+    def reopen(self, session_id):
+        """撤销 complete：请求被拒绝（未开始解析）时保留已接收的分片，客户端可以稍后重新 complete"""
+        session = self.get(session_id)
+        with session.lock:
+            session.completed = False
+            session.updated_at = time.time()
+            session.save_meta()
+        return session
+
+    def discard(self, session_id):
+        """删除会话及临时文件"""
+        if not valid_session_id(session_id):
+            raise UploadSessionError(404, "上传会话不存在或已过期")
+        with self._lock:
+            session = self._sessions.pop(session_id, None)
+        self._remove_directory(session.directory if session else os.path.join(self.root, session_id))
+
+    def _remove_directory(self, directory):
+        """只删除位于会话根目录之内的子目录"""
+        root = os.path.realpath(self.root)
+        target = os.path.realpath(directory)
+        if os.path.dirname(target) != root:
+            logger.warning(f"拒绝删除会话目录之外的路径: {directory}")
+            return
+        shutil.rmtree(target, ignore_errors=True)
+
+    def cleanup_expired(self):
+        """清理过期会话（包括其他实例遗留在共享目录中的会话）"""
+        now = time.time()
+        with self._lock:
+            expired = [sid for sid, s in self._sessions.items() if now - s.updated_at > self.ttl]
+            for sid in expired:
+                self._sessions.pop(sid, None)
+        for sid in expired:
+            self._remove_directory(os.path.join(self.root, sid))
+
+        if not os.path.isdir(self.root):
+            return
+        for name in os.listdir(self.root):
+            if not valid_session_id(name):
+                continue
+            meta_path = os.path.join(self.root, name, "meta.json")
+            try:
+                if now - os.path.getmtime(meta_path) > self.ttl:
+                    self._remove_directory(os.path.join(self.root, name))
+            except OSError:
+                continue
+
+    def _restore(self, session_id):
+        """从磁盘恢复会话，重新计算已接收内容的摘要"""
+        if not valid_session_id(session_id):
+            return None
+        directory = os.path.join(self.root, session_id)
+        meta_path = os.path.join(directory, "meta.json")
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        session = UploadSession(session_id, directory, meta.get("filename"), meta.get("total_size"), meta.get("created_at"))
+        session.chunks = meta.get("chunks", 0)
+        session.completed = meta.get("completed", False)
+        try:
+            with open(session.data_path, "rb") as f:
+                while True:
+                    block = f.read(_READ_BLOCK)
+                    if not block:
+                        break
+                    session.hasher.update(block)
+                    session.received += len(block)
+        except OSError:
+            return None
+
+        with self._lock:
+            session = self._sessions.setdefault(session_id, session)
+        logger.info(f"从磁盘恢复上传会话: {session_id} ({session.received} 字节)")
+        return session
@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+"""
+冷启动预热模块 - 在实例初始化阶段加载 PyMuPDF、创建解析 / 提取 / 匹配组件并用合成简历跑一遍流水线
+
+由函数计算的 initializer（index.initializer）或本地服务启动时调用，首个用户请求不再承担
+导入 fitz、编译技能匹配模式等开销。各步骤的耗时记录在冷启动时间线中，输出到日志、/health 和 /metrics。
+"""
+import os
+import time
+import logging
+import threading
+from contextlib import contextmanager
+
+from serialization import dumps
+
+logger = logging.getLogger(__name__)
+
+WARMUP_ENABLED = os.environ.get("WARMUP_ENABLED", "1").lower() not in ("0", "false", "no")
+
+# 合成简历：覆盖姓名、联系方式、学历、经验和技能提取
+SYNTHETIC_RESUME = (
+    "张三\n电话: 13800138000\n邮箱: zhangsan@example.com\n地址: 北京市海淀区\n"
+    "求职意向: 后端开发工程师\n教育经历\n北京大学 计算机科学与技术 本科\n"
+    "工作经历\n5年工作经验，负责订单系统的设计与开发\n"
+    "专业技能\nPython、Java、C++、TCP/IP、MySQL、Redis、Docker、Kubernetes\n"
+)
+SYNTHETIC_JD = "招聘 Python 后端开发工程师，要求3年以上工作经验，本科学历，熟悉 MySQL、Redis、Kafka 和 Docker。"
+# 写入合成 PDF 的文本（PDF 内置字体不含中文字形，只用 ASCII）
+SYNTHETIC_PDF_TEXT = "Zhang San\nPhone: 13800138000\nEmail: zhangsan@example.com\nSkills: Python, Java, MySQL, Redis, Docker\n"
+
+
+# 时间线最多记录的步骤数（同名步骤只保留最近一次，这里只是兜底）
+MAX_STEPS = 32
+
+
+class ColdStartTimeline:
+    """冷启动时间线：每一步的开始时间（相对于模块加载）和耗时（线程安全）
+
+    同名步骤重复执行（如组件初始化失败后每个请求重试）时只保留最近一次，attempts 记录执行次数，
+    时间线长度和 /metrics 中的序列数不会随请求增长。
+    """
+
+    def __init__(self):
+        self.started_at = time.time()
+        self._origin = time.perf_counter()
+        self._lock = threading.Lock()
+        self.steps = []
+        self.warmed_up = False
+
+    def record(self, name, started, duration, error=None):
+        entry = {
+            "step": name,
+            "start_ms": round((started - self._origin) * 1000, 1),
+            "duration_ms": round(duration * 1000, 1),
+            "attempts": 1,
+        }
+        if error:
+            entry["error"] = error
+        with self._lock:
+            for i, existing in enumerate(self.steps):
+                if existing["step"] == name:
+                    entry["attempts"] = existing["attempts"] + 1
+                    self.steps[i] = entry
+                    return
+            if len(self.steps) < MAX_STEPS:
+                self.steps.append(entry)
+
+    @contextmanager
+    def step(self, name):
+        """记录 with 块的耗时；块内的异常照常抛出，并记录在时间线中"""
+        started = time.perf_counter()
+        error = None
+        try:
+            yield
+        except Exception as e:
+            error = str(e)
+            raise
+        finally:
+            self.record(name, started, time.perf_counter() - started, error)
+
+    def mark(self, name):
+        """记录从模块加载到现在的耗时（如入口模块导入完成）"""
+        self.record(name, self._origin, time.perf_counter() - self._origin)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "started_at": self.started_at,
+                "warmed_up": self.warmed_up,
+                "steps": list(self.steps),
+            }
+
+
+timeline = ColdStartTimeline()
+
+
+def synthetic_pdf():
+    """用 PyMuPDF 生成一页的合成简历 PDF"""
+    import fitz
+    doc = fitz.open()
+    page = doc.new_page()
+    page.insert_text((72, 72), SYNTHETIC_PDF_TEXT, fontsize=11)
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+def run(init_components, get_components):
+    """执行预热；某一步失败只记录日志，不影响实例启动（首个请求时会再次尝试初始化）
+
+    init_components 为组件初始化函数，get_components 返回 (resume_parser, info_extractor, resume_matcher)。
+    """
+    if not WARMUP_ENABLED:
+        return timeline.snapshot()
+    started = time.perf_counter()
+    try:
+        with timeline.step("import_fitz"):
+            import fitz  # noqa: F401
+        init_components()
+        resume_parser, info_extractor, resume_matcher = get_components()
+
+        with timeline.step("synthetic_parse"):
+            # 只预热 PDF 打开和文本提取，结果不写入缓存
+            resume_parser.parse(synthetic_pdf(), include_pages=False, include_structure=False)
+        with timeline.step("synthetic_extract"):
+            extracted_info = info_extractor.extract(SYNTHETIC_RESUME)
+        with timeline.step("synthetic_match"):
+            match_result = resume_matcher.match(SYNTHETIC_RESUME, SYNTHETIC_JD, extracted_info)
+        with timeline.step("serialize"):
+            dumps({"extracted_info": extracted_info, "match": match_result})
+        timeline.warmed_up = True
+    except Exception as e:
+        logger.error(f"预热失败: {str(e)}")
+    finally:
+        timeline.record("warmup", started, time.perf_counter() - started)
+        # 结构化输出，便于在日志服务中按版本对比冷启动耗时
+        logger.info(f"冷启动时间线: {dumps(timeline.snapshot())}")
+    return timeline.snapshot()
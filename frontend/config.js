@@ -11,6 +11,15 @@ const CONFIG = {
     // 最大文件大小 (10MB)
     MAX_FILE_SIZE: 10 * 1024 * 1024,
     
+    // 超过该大小的文件使用分片上传，单个分片大小 (2MB)
+    // 分片上传会话保存在实例本地，默认关闭（阈值大于 MAX_FILE_SIZE）；
+    // 后端 UPLOAD_SESSION_DIR 配置为 NAS 等共享目录后，可改为 4 * 1024 * 1024
+    CHUNK_UPLOAD_THRESHOLD: Infinity,
+    CHUNK_SIZE: 2 * 1024 * 1024,
+    
+    // 单个分片失败后的重试次数
+    CHUNK_RETRIES: 3,
+    
     // 支持的文件类型
     SUPPORTED_TYPES: ['application/pdf'],
     
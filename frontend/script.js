@@ -8,6 +8,16 @@ const API_BASE_URL = (typeof CONFIG !== 'undefined' && CONFIG.API_BASE_URL)
     ? CONFIG.API_BASE_URL 
     : 'https://your-fc-endpoint.cn-hangzhou.fcapp.run';
 
+// 上传接口只返回页面用到的字段，省去分页文本和结构化段落
+const UPLOAD_FIELDS = 'cache_key,extracted_info,raw_text';
+
+// 分片上传配置 - 从 config.js 读取，如未定义则使用默认值
+const CHUNK_CONFIG = {
+    threshold: (typeof CONFIG !== 'undefined' && CONFIG.CHUNK_UPLOAD_THRESHOLD) || Infinity,
+    size: (typeof CONFIG !== 'undefined' && CONFIG.CHUNK_SIZE) || 2 * 1024 * 1024,
+    retries: (typeof CONFIG !== 'undefined' && CONFIG.CHUNK_RETRIES) || 3
+};
+
 // DOM 元素
 const elements = {
     fileInput: document.getElementById('file-input'),
@@ -152,19 +162,25 @@ async function handleAnalyze() {
     setButtonLoading(btn, true);
 
     try {
-        // 读取文件为 Base64
-        const base64Data = await readFileAsBase64(state.selectedFile);
-        
-        // 调用 API
-        const response = await fetch(`${API_BASE_URL}/upload`, {
-            method: 'POST',
-            headers: {
-                'Content-Type': 'application/json'
-            },
-            body: JSON.stringify({
-                file: base64Data
-            })
-        });
+        const file = state.selectedFile;
+        // 服务端已有该文件的解析结果时直接读取，不再上传
+        let response = await fetchExistingResult(file);
+        if (response) {
+            console.log('命中已有解析结果，跳过上传');
+        } else if (file.size > CHUNK_CONFIG.threshold) {
+            // 大文件分片上传，单个分片失败只重传该分片
+            response = await uploadInChunks(file);
+        } else {
+            // 直接上传 PDF 二进制，省去 Base64 编码带来的 33% 体积和编解码开销
+            const filename = encodeURIComponent(file.name);
+            response = await fetch(`${API_BASE_URL}/upload?filename=${filename}&fields=${UPLOAD_FIELDS}`, {
+                method: 'POST',
+                headers: {
+                    'Content-Type': 'application/pdf'
+                },
+                body: file
+            });
+        }
 
         const result = await response.json();
         console.log('API 返回结果:', result);
@@ -199,16 +215,86 @@ async function handleAnalyze() {
     }
 }
 
-// 读取文件为 Base64
-function readFileAsBase64(file) {
-    return new Promise((resolve, reject) => {
-        const reader = new FileReader();
-        reader.onload = () => {
-            const base64 = reader.result.split(',')[1];
-            resolve(base64);
-        };
-        reader.onerror = reject;
-        reader.readAsDataURL(file);
+// 计算文件的 SHA-256（十六进制）；不支持 Web Crypto（如非 HTTPS 页面）时返回 null
+async function hashFile(file) {
+    if (!window.crypto || !window.crypto.subtle) {
+        return null;
+    }
+    const digest = await window.crypto.subtle.digest('SHA-256', await file.arrayBuffer());
+    return Array.from(new Uint8Array(digest), b => b.toString(16).padStart(2, '0')).join('');
+}
+
+// 上传前用文件摘要询问服务端是否已有解析结果，命中时返回读取结果的响应，否则返回 null
+async function fetchExistingResult(file) {
+    try {
+        const sha256 = await hashFile(file);
+        if (!sha256) {
+            return null;
+        }
+        const checkResponse = await fetch(`${API_BASE_URL}/upload/check`, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ sha256 })
+        });
+        const check = await checkResponse.json();
+        if (!checkResponse.ok || !check.data || !check.data.exists) {
+            return null;
+        }
+        const response = await fetch(`${API_BASE_URL}/result/${check.data.cache_key}?fields=${UPLOAD_FIELDS}`);
+        // 结果可能在两次请求之间过期，此时照常上传
+        return response.ok ? response : null;
+    } catch (error) {
+        console.warn('查询已有解析结果失败，改为上传:', error);
+        return null;
+    }
+}
+
+// 分片上传：创建会话 -> 逐片 PUT（失败时查询进度后续传）-> complete
+async function uploadInChunks(file) {
+    const initResponse = await fetch(`${API_BASE_URL}/upload/session`, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ filename: file.name, size: file.size })
+    });
+    const init = await initResponse.json();
+    if (!initResponse.ok) {
+        throw new Error(init.error || `创建上传会话失败: ${initResponse.status}`);
+    }
+
+    const sessionUrl = `${API_BASE_URL}/upload/session/${init.data.session_id}`;
+    const chunkSize = init.data.chunk_size || CHUNK_CONFIG.size;
+    let offset = 0;
+    let failures = 0;
+
+    while (offset < file.size) {
+        try {
+            const chunkResponse = await fetch(`${sessionUrl}?offset=${offset}`, {
+                method: 'PUT',
+                headers: { 'Content-Type': 'application/octet-stream' },
+                body: file.slice(offset, offset + chunkSize)
+            });
+            const chunk = await chunkResponse.json();
+            if (!chunkResponse.ok) {
+                throw new Error(chunk.error || `分片上传失败: ${chunkResponse.status}`);
+            }
+            offset = chunk.data.received;
+            failures = 0;
+        } catch (error) {
+            if (++failures > CHUNK_CONFIG.retries) {
+                throw error;
+            }
+            // 以服务端记录的进度为准继续上传
+            const status = await fetch(sessionUrl).then(r => r.json()).catch(() => null);
+            if (status && status.data) {
+                offset = status.data.received;
+            }
+        }
+    }
+
+    return fetch(`${sessionUrl}/complete?fields=${UPLOAD_FIELDS}`, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: '{}'
     });
 }
 